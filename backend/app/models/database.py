@@ -4,9 +4,10 @@ SQLAlchemy models for caching and Tally connections
 """
 
 import enum
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, Enum
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, Enum
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.sql import func
 from datetime import datetime
 import logging
@@ -22,15 +23,41 @@ except ImportError:
 # ==================== DATABASE ENGINE AND SESSION ====================
 
 # Create the SQLAlchemy engine
+# Connections are pooled and pinged on checkout, so scripts and requests reuse
+# open connections and never pick up one the server has already dropped
+_engine_kwargs = {}
+if Config.DB_URL.startswith("sqlite"):
+    # Pooled SQLite connections are handed to whichever thread checks them out
+    _engine_kwargs["connect_args"] = {"check_same_thread": False}
+
 try:
     engine = create_engine(
         Config.DB_URL,
-        pool_recycle=3600  # Recycle connections every hour
+        poolclass=QueuePool,
+        pool_size=5,
+        max_overflow=10,
+        pool_pre_ping=True,
+        pool_recycle=1800,  # Recycle connections every 30 minutes
+        **_engine_kwargs
     )
 except Exception as e:
     logging.error(f"Failed to create database engine: {e}")
     raise
 
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL journal with NORMAL sync: commits skip the per-transaction fsyncs of DELETE/FULL"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", set_sqlite_pragmas)
+
 # Create a configured "Session" class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -5,6 +5,7 @@ Uses raw master data queries that DON'T trigger exception processing
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import xml.etree.ElementTree as ET
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
@@ -15,6 +16,9 @@ import threading
 
 logger = logging.getLogger(__name__)
 
+# Common Tally ports, tried after the configured one
+TALLY_FALLBACK_PORTS = (9000, 9999, 9001)
+
 
 class CustomTallyConnector:
     """
@@ -35,13 +39,17 @@ class CustomTallyConnector:
         self.host = host
         self.port = port
         self.base_url = f"http://{host}:{port}"
+        # Keep-alive session: follow-up requests reuse the open connection
+        # instead of a fresh TCP handshake per call
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
         logger.info(f"Exception-Free Connector: {self.base_url}")
 
     def test_connection(self, retries: int = 3) -> Tuple[bool, str]:
         """Simple ping test with automatic retry and port fallback"""
         # Try configured port first, then common Tally ports
         ports_to_try = [self.port]
-        for p in [9000, 9999, 9001]:
+        for p in TALLY_FALLBACK_PORTS:
             if p not in ports_to_try:
                 ports_to_try.append(p)
         
@@ -49,7 +57,7 @@ class CustomTallyConnector:
             test_url = f"http://{self.host}:{port}"
             for attempt in range(retries):
                 try:
-                    r = requests.post(test_url, data="<ENVELOPE></ENVELOPE>", timeout=3)
+                    r = self._session.post(test_url, data="<ENVELOPE></ENVELOPE>", timeout=3)
                     if r.status_code == 200:
                         # Update to working port
                         if port != self.port:
@@ -71,7 +79,7 @@ class CustomTallyConnector:
     def _request(self, xml: str, timeout: int = 8) -> str:
         """Safe request - simplified without lock gaps for faster response"""
         try:
-            r = requests.post(
+            r = self._session.post(
                 self.base_url,
                 data=xml.encode('utf-8'),
                 headers={'Content-Type': 'text/xml'},
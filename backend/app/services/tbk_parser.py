@@ -15,8 +15,25 @@ from datetime import datetime
 import logging
 from pathlib import Path
 
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
 logger = logging.getLogger(__name__)
 
+_XML_PARSE_ERRORS = (ET.ParseError,) + ((lxml_etree.XMLSyntaxError,) if lxml_etree is not None else ())
+
+# Elements the streaming parsers are done with once their end event is handled
+_STREAMED_TAGS = frozenset(('COMPANY', 'LEDGER', 'VOUCHER', 'STOCKITEM', 'GROUP', 'TALLYMESSAGE'))
+
+
+def _iterparse(source, events):
+    """iterparse with lxml's libxml2 parser when installed, ElementTree otherwise"""
+    if lxml_etree is not None:
+        return lxml_etree.iterparse(source, events=events, huge_tree=True)
+    return ET.iterparse(source, events=events)
+
 
 class TallyBackupParser:
     """Parser for Tally .tbk backup files"""
@@ -93,7 +110,7 @@ class TallyBackupParser:
         
         try:
             # Use iterparse for memory-efficient streaming
-            context = ET.iterparse(cleaned_path, events=('end',))
+            context = _iterparse(cleaned_path, events=('end',))
             
             for event, elem in context:
                 tag = elem.tag.upper() if elem.tag else ""
@@ -142,13 +159,14 @@ class TallyBackupParser:
                         result["groups"].append({"name": group_name, "parent": self._get_text(elem, 'PARENT')})
                     elem.clear()  # Free memory
                 
-                # Clear parent references to prevent memory buildup
-                if hasattr(elem, 'getparent') and elem.getparent() is not None:
+                # Clear parent references to prevent memory buildup (lxml only;
+                # child elements are still needed until their record ends)
+                if tag in _STREAMED_TAGS and hasattr(elem, 'getparent') and elem.getparent() is not None:
                     elem.getparent().remove(elem)
             
             del context  # Clean up context
             
-        except ET.ParseError as e:
+        except _XML_PARSE_ERRORS as e:
             logger.error(f"XML parse error during streaming: {e}")
             raise ValueError(f"XML parse error: {e}")
         except Exception as e:
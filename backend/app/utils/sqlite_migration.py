@@ -0,0 +1,48 @@
+"""
+SQLite Migration Helpers
+Shared setup for the one-shot schema fix scripts
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+
+@contextmanager
+def relaxed_durability(conn: sqlite3.Connection, db_path: str):
+    """
+    Back the database up, then run the block with fsyncs and the on-disk
+    journal turned off. A crash mid-migration is recovered from the backup,
+    not the journal. Yields the backup path; the original journal and
+    synchronous modes are restored on exit.
+    """
+    # Never overwrite an earlier backup: that may be the only pre-migration copy
+    stem = f"{db_path}.{datetime.now():%Y%m%d-%H%M%S}"
+    backup_path = f"{stem}.bak"
+    n = 1
+    while os.path.exists(backup_path):
+        backup_path = f"{stem}-{n}.bak"
+        n += 1
+
+    cursor = conn.cursor()
+    old_jmode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+    if old_jmode == "wal":
+        # Fold the WAL into the main file while it is still there; leaving
+        # WAL mode below drops it, so there is nothing to checkpoint later
+        cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+    backup = sqlite3.connect(backup_path)
+    conn.backup(backup)
+    backup.close()
+    print(f"Backed up database to {backup_path}")
+
+    old_sync = cursor.execute("PRAGMA synchronous").fetchone()[0]
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY").fetchall()
+    try:
+        yield backup_path
+    finally:
+        conn.rollback()  # journal_mode cannot change inside an open transaction
+        cursor.execute(f"PRAGMA journal_mode={old_jmode}").fetchall()
+        cursor.execute(f"PRAGMA synchronous={old_sync}")
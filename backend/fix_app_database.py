@@ -14,6 +14,12 @@ sys.path.insert(0, str(backend_dir))
 
 from app.models.database import Base, engine, SessionLocal
 from app.models.database import User, TallyConnection, TallyCache
+from sqlalchemy.orm import close_all_sessions
+
+# Release the default engine's pooled connections before touching the file,
+# otherwise Windows keeps the old database locked and the rename fails
+close_all_sessions()
+engine.dispose()
 
 # Path to app database
 app_db_path = backend_dir / "app" / "database.db"
@@ -40,7 +46,9 @@ from sqlalchemy import create_engine
 app_engine = create_engine(Config.DB_URL)
 
 try:
-    Base.metadata.drop_all(bind=app_engine)
+    # The old file was moved to the backup above, so there is nothing to drop
+    if app_db_path.exists():
+        Base.metadata.drop_all(bind=app_engine)
     Base.metadata.create_all(bind=app_engine)
     print("Database created successfully!")
     
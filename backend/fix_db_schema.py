@@ -1,6 +1,9 @@
 
 import sqlite3
 import os
+from contextlib import nullcontext
+
+from app.utils.sqlite_migration import relaxed_durability
 
 DB_PATH = "database.db"
 
@@ -17,22 +20,25 @@ def fix_database():
         cursor.execute("PRAGMA table_info(tally_cache)")
         columns = [info[1] for info in cursor.fetchall()]
         
-        if "last_updated" not in columns:
-            print("Adding missing column 'last_updated' to 'tally_cache'...")
-            cursor.execute("ALTER TABLE tally_cache ADD COLUMN last_updated DATETIME")
-            print("Column added successfully.")
-        else:
-            print("Column 'last_updated' already exists.")
+        # Back up and relax durability only when there is an ALTER to run
+        needs_fix = "last_updated" not in columns or "source" not in columns
+        with relaxed_durability(conn, DB_PATH) if needs_fix else nullcontext():
+            if "last_updated" not in columns:
+                print("Adding missing column 'last_updated' to 'tally_cache'...")
+                cursor.execute("ALTER TABLE tally_cache ADD COLUMN last_updated DATETIME")
+                print("Column added successfully.")
+            else:
+                print("Column 'last_updated' already exists.")
             
-        # Check for 'source' column as well, just in case
-        if "source" not in columns:
-            print("Adding missing column 'source' to 'tally_cache'...")
-            cursor.execute("ALTER TABLE tally_cache ADD COLUMN source VARCHAR(50) DEFAULT 'live'")
-            print("Column added successfully.")
-        else:
-            print("Column 'source' already exists.")
+            # Check for 'source' column as well, just in case
+            if "source" not in columns:
+                print("Adding missing column 'source' to 'tally_cache'...")
+                cursor.execute("ALTER TABLE tally_cache ADD COLUMN source VARCHAR(50) DEFAULT 'live'")
+                print("Column added successfully.")
+            else:
+                print("Column 'source' already exists.")
 
-        conn.commit()
+            conn.commit()
         print("Database schema fix completed.")
         
     except Exception as e:
@@ -1,6 +1,9 @@
 import sqlite3
 import os
 import sys
+from contextlib import nullcontext
+
+from app.utils.sqlite_migration import relaxed_durability
 
 DB_PATH = 'database.db'
 
@@ -11,10 +14,9 @@ def fix_schema():
         print("Database file not found!")
         return
 
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
         # Check tally_cache table
         cursor.execute("PRAGMA table_info(tally_cache)")
         columns = {row[1] for row in cursor.fetchall()}
@@ -27,31 +29,35 @@ def fix_schema():
             'expires_at': 'DATETIME'
         }
         
-        for col, col_def in required_columns.items():
-            if col not in columns:
-                print(f"Adding missing column: {col}")
-                try:
-                    cursor.execute(f"ALTER TABLE tally_cache ADD COLUMN {col} {col_def}")
-                    print(f"Successfully added {col}")
-                except Exception as e:
-                    print(f"Error adding {col}: {e}")
-            else:
-                print(f"Column {col} already exists")
+        # Back up and relax durability only when there is an ALTER to run
+        needs_fix = not columns.issuperset(required_columns)
+        with relaxed_durability(conn, DB_PATH) if needs_fix else nullcontext():
+            for col, col_def in required_columns.items():
+                if col not in columns:
+                    print(f"Adding missing column: {col}")
+                    try:
+                        cursor.execute(f"ALTER TABLE tally_cache ADD COLUMN {col} {col_def}")
+                        print(f"Successfully added {col}")
+                    except Exception as e:
+                        print(f"Error adding {col}: {e}")
+                else:
+                    print(f"Column {col} already exists")
                 
-        conn.commit()
+            conn.commit()
         
         # Verify again
         cursor.execute("PRAGMA table_info(tally_cache)")
         final_columns = {row[1] for row in cursor.fetchall()}
         print(f"Final columns: {final_columns}")
         
-        conn.close()
         print("Schema fix completed.")
         
     except Exception as e:
         print(f"Database error: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        conn.close()
 
 if __name__ == "__main__":
     fix_schema()
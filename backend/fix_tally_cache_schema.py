@@ -6,6 +6,8 @@ Run this script to update the existing database
 import sqlite3
 import os
 
+from app.utils.sqlite_migration import relaxed_durability
+
 def fix_schema():
     db_path = "./database.db"
     
@@ -34,54 +36,55 @@ def fix_schema():
         
         print("\nRecreating tally_cache table with nullable user_id...")
         
-        # Step 1: Backup existing data
-        cursor.execute("SELECT * FROM tally_cache")
-        existing_data = cursor.fetchall()
-        print(f"  Backed up {len(existing_data)} rows")
+        with relaxed_durability(conn, db_path):
+            # Step 1: Backup existing data
+            cursor.execute("SELECT * FROM tally_cache")
+            existing_data = cursor.fetchall()
+            print(f"  Backed up {len(existing_data)} rows")
         
-        # Step 2: Rename old table
-        cursor.execute("ALTER TABLE tally_cache RENAME TO tally_cache_old")
-        print("  Renamed old table to tally_cache_old")
+            # Step 2: Rename old table
+            cursor.execute("ALTER TABLE tally_cache RENAME TO tally_cache_old")
+            print("  Renamed old table to tally_cache_old")
         
-        # Step 3: Create new table with nullable user_id
-        cursor.execute("""
-            CREATE TABLE tally_cache (
-                id INTEGER PRIMARY KEY,
-                user_id INTEGER,
-                cache_key VARCHAR(255) NOT NULL,
-                cache_data TEXT NOT NULL,
-                cached_at DATETIME,
-                expires_at DATETIME,
-                last_updated DATETIME,
-                source VARCHAR(50) DEFAULT 'live',
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        """)
-        print("  Created new tally_cache table with nullable user_id")
+            # Step 3: Create new table with nullable user_id
+            cursor.execute("""
+                CREATE TABLE tally_cache (
+                    id INTEGER PRIMARY KEY,
+                    user_id INTEGER,
+                    cache_key VARCHAR(255) NOT NULL,
+                    cache_data TEXT NOT NULL,
+                    cached_at DATETIME,
+                    expires_at DATETIME,
+                    last_updated DATETIME,
+                    source VARCHAR(50) DEFAULT 'live',
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+            """)
+            print("  Created new tally_cache table with nullable user_id")
         
-        # Step 4: Create index on cache_key (drop existing first if any)
-        try:
-            cursor.execute("DROP INDEX IF EXISTS ix_tally_cache_cache_key")
-            cursor.execute("DROP INDEX IF EXISTS ix_tally_cache_id")
-        except:
-            pass
-        cursor.execute("CREATE INDEX IF NOT EXISTS ix_tally_cache_cache_key ON tally_cache (cache_key)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS ix_tally_cache_id ON tally_cache (id)")
-        print("  Created indexes")
+            # Step 4: Create index on cache_key (drop existing first if any)
+            try:
+                cursor.execute("DROP INDEX IF EXISTS ix_tally_cache_cache_key")
+                cursor.execute("DROP INDEX IF EXISTS ix_tally_cache_id")
+            except:
+                pass
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_tally_cache_cache_key ON tally_cache (cache_key)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_tally_cache_id ON tally_cache (id)")
+            print("  Created indexes")
         
-        # Step 5: Copy data from old table
-        if existing_data:
-            cursor.executemany("""
-                INSERT INTO tally_cache (id, user_id, cache_key, cache_data, cached_at, expires_at, last_updated, source)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, existing_data)
-            print(f"  Restored {len(existing_data)} rows")
+            # Step 5: Copy data from old table
+            if existing_data:
+                cursor.executemany("""
+                    INSERT INTO tally_cache (id, user_id, cache_key, cache_data, cached_at, expires_at, last_updated, source)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, existing_data)
+                print(f"  Restored {len(existing_data)} rows")
         
-        # Step 6: Drop old table
-        cursor.execute("DROP TABLE tally_cache_old")
-        print("  Dropped old table")
+            # Step 6: Drop old table
+            cursor.execute("DROP TABLE tally_cache_old")
+            print("  Dropped old table")
         
-        conn.commit()
+            conn.commit()
         print("\n[SUCCESS] Schema fix completed successfully!")
         
         # Verify new schema
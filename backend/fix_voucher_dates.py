@@ -5,10 +5,59 @@ This script fixes the "Voucher Date is missing" error by adding proper
 bill allocations to all vouchers involving Sundry Debtors/Creditors.
 """
 
-import re
+import mmap
 import os
+import re
+import stat
+import sys
+import tempfile
 from datetime import datetime
 
+# Bill type and stats counter for each voucher type
+_BILL_TYPE_AND_STAT = {
+    b"Sales": (b"New Ref", 'sales_fixed'),
+    b"Purchase": (b"New Ref", 'purchase_fixed'),
+    b"Receipt": (b"New Ref", 'receipt_fixed'),
+    b"Payment": (b"New Ref", 'payment_fixed'),
+    b"Journal": (b"New Ref", 'journal_fixed'),
+}
+
+_BILL_ALLOCATION_TEMPLATE = (
+    b"<BILLALLOCATIONS.LIST>\n"
+    b"<NAME>%s</NAME>\n"
+    b"<BILLTYPE>%s</BILLTYPE>\n"
+    b"<AMOUNT>%s</AMOUNT>\n"
+    b"</BILLALLOCATIONS.LIST>\n"
+)
+
+# Tally XML is processed as raw bytes: no up-front UTF-8 decode, and
+# re.ASCII keeps \s on the narrow ASCII character class.
+_VOUCHER_PATTERN = re.compile(
+    rb'(<VOUCHER\s+VCHTYPE="([^"]+)"\s+ACTION="Create">)(.*?)(</VOUCHER>)',
+    re.DOTALL | re.ASCII
+)
+
+# Ledger entries that need bill allocations
+_LEDGER_ENTRY_PATTERN = re.compile(
+    rb'(<ALLLEDGERENTRIES\.LIST>\s*<LEDGERNAME>([^<]+)</LEDGERNAME>\s*<AMOUNT>([^<]+)</AMOUNT>\s*)(</ALLLEDGERENTRIES\.LIST>)',
+    re.DOTALL | re.ASCII
+)
+
+_VOUCHER_NUMBER_PATTERN = re.compile(rb'<VOUCHERNUMBER>([^<]+)</VOUCHERNUMBER>', re.ASCII)
+_DATE_PATTERN = re.compile(rb'<DATE>([^<]+)</DATE>', re.ASCII)
+_PARTY_LEDGER_PATTERN = re.compile(rb'<PARTYLEDGERNAME>([^<]+)</PARTYLEDGERNAME>', re.ASCII)
+
+
+def _output_mode(path):
+    """Permission bits for the rewritten output: the existing file's, else the umask default"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
 def fix_tally_xml(input_file, output_file):
     """
     Process the Tally XML file and add BILLALLOCATIONS.LIST to party ledger entries.
@@ -19,24 +68,11 @@ def fix_tally_xml(input_file, output_file):
     
     start_time = datetime.now()
     
-    # Read the entire file (we need to process vouchers as blocks)
+    # Map the file instead of reading it: the bytes regexes scan the
+    # page cache directly, without a second in-memory copy
     print("Reading input file...")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    print(f"File size: {len(content):,} characters")
-    
-    # Find all voucher blocks and process them
-    voucher_pattern = re.compile(
-        r'(<VOUCHER\s+VCHTYPE="([^"]+)"\s+ACTION="Create">)(.*?)(</VOUCHER>)',
-        re.DOTALL
-    )
-    
-    # Pattern to find ledger entries that need bill allocations
-    ledger_entry_pattern = re.compile(
-        r'(<ALLLEDGERENTRIES\.LIST>\s*<LEDGERNAME>([^<]+)</LEDGERNAME>\s*<AMOUNT>([^<]+)</AMOUNT>\s*)(</ALLLEDGERENTRIES\.LIST>)',
-        re.DOTALL
-    )
+    file_size = os.path.getsize(input_file)
+    print(f"File size: {file_size:,} bytes")
     
     # Track statistics
     stats = {
@@ -58,15 +94,15 @@ def fix_tally_xml(input_file, output_file):
         
         stats['total_vouchers'] += 1
         
-        if stats['total_vouchers'] % 10000 == 0:
-            print(f"  Processed {stats['total_vouchers']:,} vouchers...")
+        if stats['total_vouchers'] % 100_000 == 0:
+            sys.stderr.write(f"  Processed {stats['total_vouchers']:,} vouchers...\n")
         
         # Extract voucher number and date for bill reference
-        vch_num_match = re.search(r'<VOUCHERNUMBER>([^<]+)</VOUCHERNUMBER>', voucher_content)
-        date_match = re.search(r'<DATE>([^<]+)</DATE>', voucher_content)
+        vch_num_match = _VOUCHER_NUMBER_PATTERN.search(voucher_content)
+        date_match = _DATE_PATTERN.search(voucher_content)
         
-        vch_number = vch_num_match.group(1) if vch_num_match else "REF1"
-        vch_date = date_match.group(1) if date_match else "20240401"
+        vch_number = vch_num_match.group(1) if vch_num_match else b"REF1"
+        vch_date = date_match.group(1) if date_match else b"20240401"
         
         # Determine bill type based on voucher type
         # Sales/Receipt = New Ref (creating receivables) or Against Ref (settling)
@@ -79,71 +115,72 @@ def fix_tally_xml(input_file, output_file):
             amount = entry_match.group(3)
             entry_end = entry_match.group(4)
             
-            # Determine bill type based on voucher type and amount sign
-            amount_val = float(amount)
-            
-            if vch_type == "Sales":
-                # For Sales: Debit party (negative amount) = New Ref
-                bill_type = "New Ref"
-                stats['sales_fixed'] += 1
-            elif vch_type == "Purchase":
-                # For Purchase: Credit party (positive amount) = New Ref
-                bill_type = "New Ref"
-                stats['purchase_fixed'] += 1
-            elif vch_type == "Receipt":
-                # For Receipt: Credit party (negative amount) = Against Ref
-                # But since we don't have existing refs, use New Ref
-                bill_type = "New Ref"
-                stats['receipt_fixed'] += 1
-            elif vch_type == "Payment":
-                # For Payment: Debit party (positive amount) = Against Ref
-                # But since we don't have existing refs, use New Ref
-                bill_type = "New Ref"
-                stats['payment_fixed'] += 1
-            elif vch_type == "Journal":
-                bill_type = "New Ref"
-                stats['journal_fixed'] += 1
-            else:
-                bill_type = "New Ref"
+            # Every party entry is a fresh bill: we have no existing refs to
+            # settle Receipts/Payments against, so all types use New Ref.
+            bill_type, stat_key = _BILL_TYPE_AND_STAT.get(vch_type, (b"New Ref", None))
+            if stat_key:
+                stats[stat_key] += 1
             
             stats['ledger_entries_fixed'] += 1
             
             # Create the bill allocation block
-            bill_allocation = f"""<BILLALLOCATIONS.LIST>
-<NAME>{vch_number}</NAME>
-<BILLTYPE>{bill_type}</BILLTYPE>
-<AMOUNT>{amount}</AMOUNT>
-</BILLALLOCATIONS.LIST>
-"""
+            bill_allocation = _BILL_ALLOCATION_TEMPLATE % (vch_number, bill_type, amount)
             
             return entry_start + bill_allocation + entry_end
         
         # Only process vouchers that involve party ledgers
         # Check if PARTYLEDGERNAME exists (indicates party transaction)
-        if '<PARTYLEDGERNAME>' in voucher_content:
+        if b'<PARTYLEDGERNAME>' in voucher_content:
             # Get the party ledger name
-            party_match = re.search(r'<PARTYLEDGERNAME>([^<]+)</PARTYLEDGERNAME>', voucher_content)
+            party_match = _PARTY_LEDGER_PATTERN.search(voucher_content)
             if party_match:
                 party_name = party_match.group(1)
                 
-                # Find and fix the ledger entry for this party
-                def fix_party_entry(entry_match):
-                    ledger_name = entry_match.group(2)
-                    # Only add bill allocation if this is the party ledger entry
-                    if ledger_name == party_name:
-                        return add_bill_allocation(entry_match)
-                    return entry_match.group(0)
+                # Jump straight to the party's ledger entries instead of
+                # regex-scanning every entry in the voucher
+                party_key = b"<LEDGERNAME>" + party_name + b"</LEDGERNAME>"
+                parts = []
+                last = 0
+                pos = voucher_content.find(party_key)
+                while pos != -1:
+                    entry_start = voucher_content.rfind(b"<ALLLEDGERENTRIES.LIST>", last, pos)
+                    entry_match = _LEDGER_ENTRY_PATTERN.match(voucher_content, entry_start) if entry_start != -1 else None
+                    if entry_match and entry_match.group(2) == party_name:
+                        parts.append(voucher_content[last:entry_start])
+                        parts.append(add_bill_allocation(entry_match))
+                        last = entry_match.end()
+                    pos = voucher_content.find(party_key, max(last, pos + len(party_key)))
                 
-                voucher_content = ledger_entry_pattern.sub(fix_party_entry, voucher_content)
+                if parts:
+                    parts.append(voucher_content[last:])
+                    voucher_content = b"".join(parts)
         
         return voucher_start + voucher_content + voucher_end
     
     print("Processing vouchers and adding bill allocations...")
-    fixed_content = voucher_pattern.sub(process_voucher, content)
+    with open(input_file, 'rb') as f:
+        if file_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                fixed_content = _VOUCHER_PATTERN.sub(process_voucher, content)
+        else:
+            fixed_content = b""
     
+    # Write next to the target and rename, so a failed run never leaves
+    # a truncated output file behind
     print(f"\nWriting output file...")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(fixed_content)
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    with tempfile.NamedTemporaryFile('wb', buffering=1 << 20, dir=output_dir, delete=False) as f:
+        temp_path = f.name
+        try:
+            f.write(fixed_content)
+            # NamedTemporaryFile is created 0600; keep the mode a plain
+            # open() would give (or the existing output's), not owner-only
+            os.chmod(temp_path, _output_mode(output_file))
+        except BaseException:
+            f.close()
+            os.unlink(temp_path)
+            raise
+    os.replace(temp_path, output_file)
     
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
@@ -5,12 +5,20 @@ CLEAN VERSION - NO EXCEPTIONS GUARANTEED
 - All party ledger entries have proper bill allocations
 """
 
-import random
+import functools
+import gzip
+import multiprocessing
 import os
+import random
+import shutil
+import tempfile
 from datetime import datetime, timedelta
 
-# Set random seed for reproducibility
-random.seed(42)
+import numpy as np
+
+# Dedicated generator seeded for reproducibility (same sequence as
+# random.seed(42), without touching the shared module-level state)
+_random = random.Random(42)
 
 # Configuration
 COMPANY_NAME = "Test Company 2L"
@@ -24,6 +32,14 @@ RECEIPT_VOUCHERS = 25000
 PAYMENT_VOUCHERS = 25000
 JOURNAL_VOUCHERS = 10000
 
+# Write tally_2lakh_clean.xml.gz instead (the XML compresses ~20x; level 1
+# keeps compression close to copy speed)
+GZIP_OUTPUT = os.getenv("TALLY_GZIP", "False") == "True"
+
+# Vouchers generated per worker-process shard
+VOUCHERS_PER_SHARD = 25000
+VOUCHERS_PER_FLUSH = 10000
+
 # Ledger counts (ensure enough for all vouchers)
 NUM_DEBTORS = 15000
 NUM_CREDITORS = 15000
@@ -47,11 +63,272 @@ COMPANY_SUFFIXES = ["Pvt Ltd", "Ltd", "Enterprises", "Industries", "Trading Co",
 PRODUCTS = ["Steel", "Cement", "Textiles", "Chemicals", "Electronics", "Machinery", "Paper", "Plastic",
             "Rubber", "Glass", "Wood", "Metal", "Paint", "Oil", "Food", "Pharma", "Auto Parts", "Hardware"]
 
+_KIND = ('Supplies', 'Products', 'Materials')
+_EXP = ('Office', 'Travel', 'Rent', 'Utilities', 'Misc')
+_INC = ('Interest', 'Commission', 'Service', 'Other')
+
+# Every possible voucher date in the financial year, formatted once
+DATE_CACHE = tuple((datetime(2024, 4, 1) + timedelta(days=d)).strftime('%Y%m%d').encode('ascii') for d in range(365))
+
+# Voucher number prefix per voucher type
+_PREFIX = {vch_type: vch_type[:3].upper().encode('ascii') for vch_type in ("Sales", "Purchase", "Receipt", "Payment", "Journal")}
+
+# (party sign, contra sign) per voucher type, as Tally stores amounts:
+# - Sales: party (Debtor) debited (negative), Sales credited (positive)
+# - Purchase: party (Creditor) credited (positive), Purchase debited (negative)
+# - Receipt: party (Debtor) credited (negative = reduces receivable), Bank debited
+# - Payment: party (Creditor) debited (positive = reduces payable), Bank credited
+# - Journal: party positive, contra negative
+_SIGNS = {
+    "Sales": (-1, 1),
+    "Purchase": (1, -1),
+    "Receipt": (-1, 1),
+    "Payment": (1, -1),
+    "Journal": (1, -1),
+}
+_PARTY_NEGATIVE = {vch_type: party_sign < 0 for vch_type, (party_sign, _) in _SIGNS.items()}
+
+# Voucher XML is composed from bytes fragments and filled with a single
+# %-format per voucher; %b only accepts bytes, so a stray str fails loudly.
+_BILL_ALLOCATION_TMPL = b'''<BILLALLOCATIONS.LIST>
+<NAME>%b</NAME>
+<BILLTYPE>New Ref</BILLTYPE>
+<AMOUNT>%b</AMOUNT>
+</BILLALLOCATIONS.LIST>
+'''
+
+# (vch_type, vdate, vch_type, vch_code, party, total, party, party_amt)
+_VCH_HEAD_TMPL = b'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
+<VOUCHER VCHTYPE="%b" ACTION="Create">
+<DATE>%b</DATE>
+<VOUCHERTYPENAME>%b</VOUCHERTYPENAME>
+<VOUCHERNUMBER>%b</VOUCHERNUMBER>
+<PARTYLEDGERNAME>%b</PARTYLEDGERNAME>
+<AMOUNT>%b</AMOUNT>
+<ALLLEDGERENTRIES.LIST>
+<LEDGERNAME>%b</LEDGERNAME>
+<AMOUNT>%b</AMOUNT>
+'''
+
+# (contra, contra_amt)
+_VCH_CONTRA_TMPL = b'''</ALLLEDGERENTRIES.LIST>
+<ALLLEDGERENTRIES.LIST>
+<LEDGERNAME>%b</LEDGERNAME>
+<AMOUNT>%b</AMOUNT>
+'''
+
+_VCH_TAIL = b'''</ALLLEDGERENTRIES.LIST>
+</VOUCHER>
+</TALLYMESSAGE>
+'''
+
+# Bill allocation on the party leg only. Placeholders:
+# (vch_type, vdate, vch_type, vch_code, party, total, party, party_amt,
+#  vch_code, party_amt, contra, contra_amt)
+_VCH_TMPL_SINGLE = _VCH_HEAD_TMPL + _BILL_ALLOCATION_TMPL + _VCH_CONTRA_TMPL + _VCH_TAIL
+
+# Bill allocation on the contra leg too (Journal: both entries are party
+# ledgers); adds (vch_code, contra_amt)
+_VCH_TMPL_DOUBLE = (_VCH_HEAD_TMPL + _BILL_ALLOCATION_TMPL + _VCH_CONTRA_TMPL
+                    + _BILL_ALLOCATION_TMPL + _VCH_TAIL)
+
+_LEDGER_TEMPLATE = '''<TALLYMESSAGE xmlns:UDF="TallyUDF">
+<LEDGER NAME="{name}" ACTION="Create">
+<NAME>{name}</NAME>
+<PARENT>{parent}</PARENT>
+</LEDGER>
+</TALLYMESSAGE>
+'''
+
+_OPENING_LEDGER_TEMPLATE = '''<TALLYMESSAGE xmlns:UDF="TallyUDF">
+<LEDGER NAME="{name}" ACTION="Create">
+<NAME>{name}</NAME>
+<PARENT>{parent}</PARENT>
+<OPENINGBALANCE>{opening}</OPENINGBALANCE>
+</LEDGER>
+</TALLYMESSAGE>
+'''
+
+
+# ============ STATIC XML ============
+# Everything that does not depend on generated data is rendered once at import
+
+XML_HEADER = f'''<?xml version="1.0" encoding="UTF-8"?>
+<ENVELOPE>
+<HEADER>
+<TALLYREQUEST>Import Data</TALLYREQUEST>
+</HEADER>
+<BODY>
+<IMPORTDATA>
+<REQUESTDESC>
+<REPORTNAME>All Masters</REPORTNAME>
+<STATICVARIABLES><SVCURRENTCOMPANY>{COMPANY_NAME}</SVCURRENTCOMPANY></STATICVARIABLES>
+</REQUESTDESC>
+<REQUESTDATA>
+'''
+
+COMPANY_XML = f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
+<COMPANY NAME="{COMPANY_NAME}" ACTION="Create">
+<NAME>{COMPANY_NAME}</NAME>
+<STARTINGFROM>{FY_START}</STARTINGFROM>
+<ENDINGAT>{FY_END}</ENDINGAT>
+<CURRENCYNAME>INR</CURRENCYNAME>
+</COMPANY>
+</TALLYMESSAGE>
+'''
+
+# Groups (Using Tally's built-in parent groups)
+GROUPS = [
+    ("Sundry Debtors", "Current Assets"),
+    ("Sundry Creditors", "Current Liabilities"),
+    ("Sales Accounts", "Direct Incomes"),
+    ("Purchase Accounts", "Direct Expenses"),
+    ("Direct Expenses", "Expenses"),
+    ("Indirect Expenses", "Expenses"),
+    ("Direct Incomes", "Income"),
+    ("Indirect Incomes", "Income"),
+    ("Bank Accounts", "Current Assets"),
+    ("Cash-in-Hand", "Current Assets"),
+]
+
+GROUP_TMPL = '''<TALLYMESSAGE xmlns:UDF="TallyUDF">
+<GROUP NAME="{0}" ACTION="Create">
+<NAME>{0}</NAME>
+<PARENT>{1}</PARENT>
+</GROUP>
+</TALLYMESSAGE>
+'''
+
+GROUPS_XML = ''.join(GROUP_TMPL.format(gname, parent) for gname, parent in GROUPS)
+
+PREAMBLE = (XML_HEADER + COMPANY_XML + GROUPS_XML).encode('ascii')
+
+BANK_CASH_XML = b'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
+<LEDGER NAME="HDFC Bank" ACTION="Create">
+<NAME>HDFC Bank</NAME>
+<PARENT>Bank Accounts</PARENT>
+<OPENINGBALANCE>10000000</OPENINGBALANCE>
+</LEDGER>
+</TALLYMESSAGE>
+<TALLYMESSAGE xmlns:UDF="TallyUDF">
+<LEDGER NAME="Cash" ACTION="Create">
+<NAME>Cash</NAME>
+<PARENT>Cash-in-Hand</PARENT>
+<OPENINGBALANCE>500000</OPENINGBALANCE>
+</LEDGER>
+</TALLYMESSAGE>
+'''
+
+
+def generate_party_names(count, tag):
+    """Generate `count` unique debtor/creditor names, suffixed with `tag` and serial number"""
+    # Draw every random pick up front: one C-level loop per pool
+    choices = _random.choices
+    firsts = choices(FIRST_NAMES, k=count)
+    lasts = choices(LAST_NAMES, k=count)
+    suffixes = choices(COMPANY_SUFFIXES, k=count)
+    products = choices(PRODUCTS, k=count)
+    kinds = choices(_KIND, k=count)
+    
+    names = []
+    for i in range(1, count + 1):
+        j = i - 1
+        if i % 3 == 0:
+            name = f"{firsts[j]} {lasts[j]} {suffixes[j]} {tag}{i}"
+        elif i % 3 == 1:
+            name = f"{firsts[j]} {lasts[j]} {tag}{i}"
+        else:
+            name = f"{products[j]} {kinds[j]} {tag}{i}"
+        names.append(name)
+    return names
+
+
+def _open_output(path):
+    """Open `path` for writing as a raw, unbuffered binary file descriptor"""
+    # O_BINARY only exists (and matters) on Windows: without it os.write
+    # would translate newlines
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return fd
+
+
+def _write_all(fd, data):
+    """os.write the whole of `data` to `fd`, resuming after short writes"""
+    with memoryview(data) as view:
+        written = 0
+        while written < len(view):
+            written += os.write(fd, view[written:])
+
+
+def _flush(write, buf):
+    """Hand the buffered bytes to `write` and empty the buffer"""
+    write(buf)
+    buf.clear()
+
+
+def write_voucher_with_bill_alloc(buf, vch_type, vch_num, party_name, contra_name, amount, vdate):
+    """
+    Write a voucher with proper bill allocations.
+    Journal vouchers have party ledgers on both legs, so both get one.
+    `vch_type` is a str; names and `vdate` are pre-encoded bytes.
+    """
+    vch_code = b'%s%d' % (_PREFIX[vch_type], vch_num)
+    vch_type_b = vch_type.encode('ascii')
+    
+    # Both legs share one magnitude: format it once, negate by prefixing '-'
+    amt = b'%d' % amount
+    neg = b'-' + amt
+    if _PARTY_NEGATIVE[vch_type]:
+        party_amt, contra_amt = neg, amt
+    else:
+        party_amt, contra_amt = amt, neg
+    
+    if vch_type == "Journal":
+        buf += _VCH_TMPL_DOUBLE % (vch_type_b, vdate, vch_type_b, vch_code, party_name, amt,
+                                   party_name, party_amt, vch_code, party_amt,
+                                   contra_name, contra_amt, vch_code, contra_amt)
+    else:
+        buf += _VCH_TMPL_SINGLE % (vch_type_b, vdate, vch_type_b, vch_code, party_name, amt,
+                                   party_name, party_amt, vch_code, party_amt,
+                                   contra_name, contra_amt)
+
+
+def _write_voucher_shard(shard_path, vch_type, first_num, count, party_names, contra_names, seed):
+    """Write `count` vouchers of one type, numbered from `first_num`, to a shard file (worker process)"""
+    rng = np.random.default_rng(seed)
+    party_idx = rng.integers(0, len(party_names), count).tolist()
+    contra_idx = rng.integers(0, len(contra_names), count).tolist()
+    amounts = rng.integers(1000, 100001, count).tolist()
+    days = rng.integers(0, 365, count).tolist()
+    
+    # Flushing happens between fixed-size chunks, keeping the per-voucher
+    # loop free of counter checks
+    buf = bytearray()
+    fd = _open_output(shard_path)
+    write = functools.partial(_write_all, fd)
+    try:
+        for chunk_start in range(0, count, VOUCHERS_PER_FLUSH):
+            for i in range(chunk_start, min(chunk_start + VOUCHERS_PER_FLUSH, count)):
+                party = party_names[party_idx[i]]
+                contra = contra_names[contra_idx[i]]
+                amount = amounts[i]
+                vdate = DATE_CACHE[days[i]]
+                write_voucher_with_bill_alloc(buf, vch_type, first_num + i, party, contra, amount, vdate)
+            _flush(write, buf)
+    finally:
+        os.close(fd)
+    
+    print(f"    Written {vch_type} vouchers {first_num:,}-{first_num + count - 1:,}...")
+    return shard_path
+
 
-def generate_xml():
+def generate_xml(compress=GZIP_OUTPUT):
     """Generate complete Tally XML file with zero exceptions"""
     
     output_file = os.path.join(os.path.dirname(__file__), "tally_2lakh_clean.xml")
+    if compress:
+        output_file += ".gz"
     
     print("=" * 60)
     print("GENERATING CLEAN TALLY DATA - ZERO EXCEPTIONS")
@@ -60,30 +337,14 @@ def generate_xml():
     # Pre-generate all ledger names to ensure consistency
     print("\nGenerating ledger names...")
     
-    debtor_names = []
-    for i in range(1, NUM_DEBTORS + 1):
-        if i % 3 == 0:
-            name = f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)} {random.choice(COMPANY_SUFFIXES)} D{i}"
-        elif i % 3 == 1:
-            name = f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)} D{i}"
-        else:
-            name = f"{random.choice(PRODUCTS)} {random.choice(['Supplies', 'Products', 'Materials'])} D{i}"
-        debtor_names.append(name)
+    debtor_names = generate_party_names(NUM_DEBTORS, "D")
+    creditor_names = generate_party_names(NUM_CREDITORS, "C")
     
-    creditor_names = []
-    for i in range(1, NUM_CREDITORS + 1):
-        if i % 3 == 0:
-            name = f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)} {random.choice(COMPANY_SUFFIXES)} C{i}"
-        elif i % 3 == 1:
-            name = f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)} C{i}"
-        else:
-            name = f"{random.choice(PRODUCTS)} {random.choice(['Supplies', 'Products', 'Materials'])} C{i}"
-        creditor_names.append(name)
-    
-    sales_names = [f"Sales - {random.choice(PRODUCTS)} S{i}" for i in range(1, NUM_SALES_LEDGERS + 1)]
-    purchase_names = [f"Purchase - {random.choice(PRODUCTS)} P{i}" for i in range(1, NUM_PURCHASE_LEDGERS + 1)]
-    expense_names = [f"Expense - {random.choice(['Office', 'Travel', 'Rent', 'Utilities', 'Misc'])} E{i}" for i in range(1, NUM_EXPENSE_LEDGERS + 1)]
-    income_names = [f"Income - {random.choice(['Interest', 'Commission', 'Service', 'Other'])} I{i}" for i in range(1, NUM_INCOME_LEDGERS + 1)]
+    choices = _random.choices
+    sales_names = [f"Sales - {product} S{i}" for i, product in enumerate(choices(PRODUCTS, k=NUM_SALES_LEDGERS), 1)]
+    purchase_names = [f"Purchase - {product} P{i}" for i, product in enumerate(choices(PRODUCTS, k=NUM_PURCHASE_LEDGERS), 1)]
+    expense_names = [f"Expense - {kind} E{i}" for i, kind in enumerate(choices(_EXP, k=NUM_EXPENSE_LEDGERS), 1)]
+    income_names = [f"Income - {kind} I{i}" for i, kind in enumerate(choices(_INC, k=NUM_INCOME_LEDGERS), 1)]
     
     print(f"  Debtors: {len(debtor_names):,}")
     print(f"  Creditors: {len(creditor_names):,}")
@@ -99,298 +360,114 @@ def generate_xml():
     print(f"Total Vouchers: {total_vouchers:,}")
     print(f"Total Records: {total_ledgers + total_vouchers:,}")
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        # XML Header
-        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-        f.write('<ENVELOPE>\n')
-        f.write('<HEADER>\n')
-        f.write('<TALLYREQUEST>Import Data</TALLYREQUEST>\n')
-        f.write('</HEADER>\n')
-        f.write('<BODY>\n')
-        f.write('<IMPORTDATA>\n')
-        f.write('<REQUESTDESC>\n')
-        f.write('<REPORTNAME>All Masters</REPORTNAME>\n')
-        f.write(f'<STATICVARIABLES><SVCURRENTCOMPANY>{COMPANY_NAME}</SVCURRENTCOMPANY></STATICVARIABLES>\n')
-        f.write('</REQUESTDESC>\n')
-        f.write('<REQUESTDATA>\n')
-        
-        # Company
-        f.write(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
-<COMPANY NAME="{COMPANY_NAME}" ACTION="Create">
-<NAME>{COMPANY_NAME}</NAME>
-<STARTINGFROM>{FY_START}</STARTINGFROM>
-<ENDINGAT>{FY_END}</ENDINGAT>
-<CURRENCYNAME>INR</CURRENCYNAME>
-</COMPANY>
-</TALLYMESSAGE>
-''')
+    # Records are encoded into a bytearray and written in large blocks
+    # straight to the file descriptor: one os.write per ~10k records, with
+    # no BufferedWriter copy in between. All generated text is ASCII, which
+    # takes CPython's fast encode path.
+    fd = _open_output(output_file)
+    gz = None
+    try:
+        if compress:
+            raw = open(fd, 'wb', buffering=0, closefd=False)
+            gz = gzip.GzipFile(filename="tally_2lakh_clean.xml", mode='wb', compresslevel=1, fileobj=raw)
+            write = gz.write
+        else:
+            write = functools.partial(_write_all, fd)
         
-        # Groups (Using Tally's built-in parent groups)
-        groups = [
-            ("Sundry Debtors", "Current Assets"),
-            ("Sundry Creditors", "Current Liabilities"),
-            ("Sales Accounts", "Direct Incomes"),
-            ("Purchase Accounts", "Direct Expenses"),
-            ("Direct Expenses", "Expenses"),
-            ("Indirect Expenses", "Expenses"),
-            ("Direct Incomes", "Income"),
-            ("Indirect Incomes", "Income"),
-            ("Bank Accounts", "Current Assets"),
-            ("Cash-in-Hand", "Current Assets"),
-        ]
+        buf = bytearray()
         
-        for gname, parent in groups:
-            f.write(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
-<GROUP NAME="{gname}" ACTION="Create">
-<NAME>{gname}</NAME>
-<PARENT>{parent}</PARENT>
-</GROUP>
-</TALLYMESSAGE>
-''')
+        # Static header, company and groups
+        buf += PREAMBLE
         
         # ============ LEDGERS ============
         print("\nWriting ledgers...")
-        ledger_count = 0
-        
-        # Sundry Debtors
-        for name in debtor_names:
-            opening = random.randint(0, 500000)
-            f.write(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
-<LEDGER NAME="{name}" ACTION="Create">
-<NAME>{name}</NAME>
-<PARENT>Sundry Debtors</PARENT>
-<OPENINGBALANCE>{opening}</OPENINGBALANCE>
-</LEDGER>
-</TALLYMESSAGE>
-''')
-            ledger_count += 1
-            if ledger_count % 10000 == 0:
-                print(f"  Written {ledger_count:,} ledgers...")
+        # Opening balances are drawn and stringified in bulk with NumPy
+        rng = np.random.default_rng(42)
         
-        # Sundry Creditors
-        for name in creditor_names:
-            opening = random.randint(-500000, 0)
-            f.write(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
-<LEDGER NAME="{name}" ACTION="Create">
-<NAME>{name}</NAME>
-<PARENT>Sundry Creditors</PARENT>
-<OPENINGBALANCE>{opening}</OPENINGBALANCE>
-</LEDGER>
-</TALLYMESSAGE>
-''')
-            ledger_count += 1
-            if ledger_count % 10000 == 0:
-                print(f"  Written {ledger_count:,} ledgers...")
+        # Each ledger class is rendered as one joined block
+        debtor_openings = np.char.mod('%d', rng.integers(0, 500001, NUM_DEBTORS)).tolist()
+        buf += ''.join(_OPENING_LEDGER_TEMPLATE.format(name=name, parent="Sundry Debtors", opening=opening)
+                       for name, opening in zip(debtor_names, debtor_openings)).encode('ascii')
+        _flush(write, buf)
         
-        # Sales Accounts
-        for name in sales_names:
-            f.write(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
-<LEDGER NAME="{name}" ACTION="Create">
-<NAME>{name}</NAME>
-<PARENT>Sales Accounts</PARENT>
-</LEDGER>
-</TALLYMESSAGE>
-''')
-            ledger_count += 1
+        creditor_openings = np.char.mod('%d', rng.integers(-500000, 1, NUM_CREDITORS)).tolist()
+        buf += ''.join(_OPENING_LEDGER_TEMPLATE.format(name=name, parent="Sundry Creditors", opening=opening)
+                       for name, opening in zip(creditor_names, creditor_openings)).encode('ascii')
+        _flush(write, buf)
         
-        # Purchase Accounts
-        for name in purchase_names:
-            f.write(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
-<LEDGER NAME="{name}" ACTION="Create">
-<NAME>{name}</NAME>
-<PARENT>Purchase Accounts</PARENT>
-</LEDGER>
-</TALLYMESSAGE>
-''')
-            ledger_count += 1
-        
-        # Expense Ledgers
-        for name in expense_names:
-            f.write(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
-<LEDGER NAME="{name}" ACTION="Create">
-<NAME>{name}</NAME>
-<PARENT>Indirect Expenses</PARENT>
-</LEDGER>
-</TALLYMESSAGE>
-''')
-            ledger_count += 1
-        
-        # Income Ledgers
-        for name in income_names:
-            f.write(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
-<LEDGER NAME="{name}" ACTION="Create">
-<NAME>{name}</NAME>
-<PARENT>Indirect Incomes</PARENT>
-</LEDGER>
-</TALLYMESSAGE>
-''')
-            ledger_count += 1
+        buf += ''.join(_LEDGER_TEMPLATE.format(name=name, parent="Sales Accounts") for name in sales_names).encode('ascii')
+        buf += ''.join(_LEDGER_TEMPLATE.format(name=name, parent="Purchase Accounts") for name in purchase_names).encode('ascii')
+        buf += ''.join(_LEDGER_TEMPLATE.format(name=name, parent="Indirect Expenses") for name in expense_names).encode('ascii')
+        buf += ''.join(_LEDGER_TEMPLATE.format(name=name, parent="Indirect Incomes") for name in income_names).encode('ascii')
+        _flush(write, buf)
         
         # Bank and Cash
-        f.write(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
-<LEDGER NAME="HDFC Bank" ACTION="Create">
-<NAME>HDFC Bank</NAME>
-<PARENT>Bank Accounts</PARENT>
-<OPENINGBALANCE>10000000</OPENINGBALANCE>
-</LEDGER>
-</TALLYMESSAGE>
-''')
-        
-        f.write(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
-<LEDGER NAME="Cash" ACTION="Create">
-<NAME>Cash</NAME>
-<PARENT>Cash-in-Hand</PARENT>
-<OPENINGBALANCE>500000</OPENINGBALANCE>
-</LEDGER>
-</TALLYMESSAGE>
-''')
+        buf += BANK_CASH_XML
         
-        print(f"  Total ledgers written: {ledger_count + 2:,}")
+        print(f"  Total ledgers written: {total_ledgers:,}")
         
         # ============ VOUCHERS ============
+        # Vouchers are independent, so shards of each voucher class are
+        # generated in parallel worker processes and spliced in afterwards
         print("\nWriting vouchers...")
-        start_date = datetime(2024, 4, 1)
-        voucher_num = 0
-        
-        def get_random_date():
-            days = random.randint(0, 364)
-            return (start_date + timedelta(days=days)).strftime('%Y%m%d')
+        # Each party/contra name is encoded once here rather than once per
+        # voucher that references it
+        debtor_names_b = [name.encode('ascii') for name in debtor_names]
+        creditor_names_b = [name.encode('ascii') for name in creditor_names]
+        sales_names_b = [name.encode('ascii') for name in sales_names]
+        purchase_names_b = [name.encode('ascii') for name in purchase_names]
+        bank_names_b = [b"HDFC Bank"]
         
-        def write_voucher_with_bill_alloc(f, vch_type, vch_num, party_name, contra_name, amount, vdate, 
-                                          party_is_debtor=True, both_party=False, second_party_name=None):
-            """
-            Write a voucher with proper bill allocations.
-            - party_is_debtor: True if party is Sundry Debtor, False if Sundry Creditor
-            - both_party: True if both entries are party ledgers (for Journal)
-            """
-            vch_code = f"{vch_type[:3].upper()}{vch_num}"
-            
-            if vch_type == "Sales":
-                # Party (Debtor) is Debited (negative in Tally), Sales is Credited (positive)
-                party_amt = -amount
-                contra_amt = amount
-            elif vch_type == "Purchase":
-                # Party (Creditor) is Credited (positive in Tally), Purchase is Debited (negative)
-                party_amt = amount
-                contra_amt = -amount
-            elif vch_type == "Receipt":
-                # Party (Debtor) is Credited (negative in Tally = reduces receivable), Bank is Debited
-                party_amt = -amount
-                contra_amt = amount
-            elif vch_type == "Payment":
-                # Party (Creditor) is Debited (positive = reduces payable), Bank is Credited
-                party_amt = amount
-                contra_amt = -amount
-            else:  # Journal
-                party_amt = amount
-                contra_amt = -amount
-            
-            f.write(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
-<VOUCHER VCHTYPE="{vch_type}" ACTION="Create">
-<DATE>{vdate}</DATE>
-<VOUCHERTYPENAME>{vch_type}</VOUCHERTYPENAME>
-<VOUCHERNUMBER>{vch_code}</VOUCHERNUMBER>
-<PARTYLEDGERNAME>{party_name}</PARTYLEDGERNAME>
-<AMOUNT>{abs(amount)}</AMOUNT>
-<ALLLEDGERENTRIES.LIST>
-<LEDGERNAME>{party_name}</LEDGERNAME>
-<AMOUNT>{party_amt}</AMOUNT>
-<BILLALLOCATIONS.LIST>
-<NAME>{vch_code}</NAME>
-<BILLTYPE>New Ref</BILLTYPE>
-<AMOUNT>{party_amt}</AMOUNT>
-</BILLALLOCATIONS.LIST>
-</ALLLEDGERENTRIES.LIST>
-<ALLLEDGERENTRIES.LIST>
-<LEDGERNAME>{contra_name}</LEDGERNAME>
-<AMOUNT>{contra_amt}</AMOUNT>''')
-            
-            # If contra is also a party ledger (Journal entries), add bill allocation
-            if both_party and second_party_name:
-                f.write(f'''
-<BILLALLOCATIONS.LIST>
-<NAME>{vch_code}</NAME>
-<BILLTYPE>New Ref</BILLTYPE>
-<AMOUNT>{contra_amt}</AMOUNT>
-</BILLALLOCATIONS.LIST>''')
-            
-            f.write('''
-</ALLLEDGERENTRIES.LIST>
-</VOUCHER>
-</TALLYMESSAGE>
-''')
-        
-        # Sales Vouchers
-        print(f"  Writing {SALES_VOUCHERS:,} Sales vouchers...")
-        for i in range(SALES_VOUCHERS):
-            voucher_num += 1
-            party = random.choice(debtor_names)
-            contra = random.choice(sales_names)
-            amount = random.randint(1000, 100000)
-            vdate = get_random_date()
-            write_voucher_with_bill_alloc(f, "Sales", voucher_num, party, contra, amount, vdate, party_is_debtor=True)
-            
-            if voucher_num % 25000 == 0:
-                print(f"    Written {voucher_num:,} vouchers...")
-        
-        # Purchase Vouchers
-        print(f"  Writing {PURCHASE_VOUCHERS:,} Purchase vouchers...")
-        for i in range(PURCHASE_VOUCHERS):
-            voucher_num += 1
-            party = random.choice(creditor_names)
-            contra = random.choice(purchase_names)
-            amount = random.randint(1000, 100000)
-            vdate = get_random_date()
-            write_voucher_with_bill_alloc(f, "Purchase", voucher_num, party, contra, amount, vdate, party_is_debtor=False)
-            
-            if voucher_num % 25000 == 0:
-                print(f"    Written {voucher_num:,} vouchers...")
+        voucher_classes = [
+            ("Sales", SALES_VOUCHERS, debtor_names_b, sales_names_b),
+            ("Purchase", PURCHASE_VOUCHERS, creditor_names_b, purchase_names_b),
+            ("Receipt", RECEIPT_VOUCHERS, debtor_names_b, bank_names_b),
+            ("Payment", PAYMENT_VOUCHERS, creditor_names_b, bank_names_b),
+            # Journal: both entries are party ledgers - need bill allocations on both
+            ("Journal", JOURNAL_VOUCHERS, debtor_names_b, creditor_names_b),
+        ]
         
-        # Receipt Vouchers
-        print(f"  Writing {RECEIPT_VOUCHERS:,} Receipt vouchers...")
-        for i in range(RECEIPT_VOUCHERS):
-            voucher_num += 1
-            party = random.choice(debtor_names)
-            contra = "HDFC Bank"
-            amount = random.randint(1000, 100000)
-            vdate = get_random_date()
-            write_voucher_with_bill_alloc(f, "Receipt", voucher_num, party, contra, amount, vdate, party_is_debtor=True)
-            
-            if voucher_num % 25000 == 0:
-                print(f"    Written {voucher_num:,} vouchers...")
+        shard_dir = tempfile.mkdtemp(prefix="tally_shards_", dir=os.path.dirname(output_file))
+        shards = []
+        first_num = 1
+        for vch_type, count, party_names, contra_names in voucher_classes:
+            print(f"  Queueing {count:,} {vch_type} vouchers...")
+            for start in range(0, count, VOUCHERS_PER_SHARD):
+                shard_count = min(VOUCHERS_PER_SHARD, count - start)
+                shard_path = os.path.join(shard_dir, f"shard_{len(shards):03d}.xml")
+                shards.append((shard_path, vch_type, first_num, shard_count,
+                               party_names, contra_names, 42 + len(shards)))
+                first_num += shard_count
         
-        # Payment Vouchers
-        print(f"  Writing {PAYMENT_VOUCHERS:,} Payment vouchers...")
-        for i in range(PAYMENT_VOUCHERS):
-            voucher_num += 1
-            party = random.choice(creditor_names)
-            contra = "HDFC Bank"
-            amount = random.randint(1000, 100000)
-            vdate = get_random_date()
-            write_voucher_with_bill_alloc(f, "Payment", voucher_num, party, contra, amount, vdate, party_is_debtor=False)
+        try:
+            with multiprocessing.Pool(min(os.cpu_count() or 1, len(shards))) as pool:
+                shard_paths = pool.starmap(_write_voucher_shard, shards)
             
-            if voucher_num % 25000 == 0:
-                print(f"    Written {voucher_num:,} vouchers...")
-        
-        # Journal Vouchers (both entries are party ledgers - need bill allocations on both)
-        print(f"  Writing {JOURNAL_VOUCHERS:,} Journal vouchers...")
-        for i in range(JOURNAL_VOUCHERS):
-            voucher_num += 1
-            party = random.choice(debtor_names)
-            contra = random.choice(creditor_names)
-            amount = random.randint(1000, 100000)
-            vdate = get_random_date()
-            write_voucher_with_bill_alloc(f, "Journal", voucher_num, party, contra, amount, vdate, 
-                                          party_is_debtor=True, both_party=True, second_party_name=contra)
-            
-            if voucher_num % 25000 == 0:
-                print(f"    Written {voucher_num:,} vouchers...")
+            _flush(write, buf)
+            chunk = bytearray(8 * 1024 * 1024)
+            chunk_view = memoryview(chunk)
+            for shard_path in shard_paths:
+                with open(shard_path, 'rb', buffering=0) as shard:
+                    while True:
+                        n = shard.readinto(chunk)
+                        if not n:
+                            break
+                        write(chunk_view[:n])
+        finally:
+            shutil.rmtree(shard_dir, ignore_errors=True)
         
         # Close XML
-        f.write('</REQUESTDATA>\n')
-        f.write('</IMPORTDATA>\n')
-        f.write('</BODY>\n')
-        f.write('</ENVELOPE>\n')
+        buf += b'</REQUESTDATA>\n'
+        buf += b'</IMPORTDATA>\n'
+        buf += b'</BODY>\n'
+        buf += b'</ENVELOPE>\n'
+        _flush(write, buf)
+        
+        if gz is not None:
+            gz.close()
+            raw.close()
+    finally:
+        os.close(fd)
     
     file_size = os.path.getsize(output_file) / (1024 * 1024)
     
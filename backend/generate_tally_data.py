@@ -13,6 +13,7 @@ NUM_VOUCHERS = 150000    # 150,000 vouchers
 COMPANY_NAME = "Test Company 2L"
 FY_START = "20240401"
 FY_END = "20250331"
+RECORDS_PER_WRITE = 10000  # records joined into each file write
 
 # Sample data pools
 FIRST_NAMES = ["Raj", "Amit", "Priya", "Neha", "Vikram", "Anita", "Suresh", "Kavita", "Rahul", "Deepa",
@@ -52,6 +53,12 @@ def generate_xml():
     output_file = os.path.join(os.path.dirname(__file__), "tally_2lakh_data.xml")
     
     with open(output_file, 'w', encoding='utf-8') as f:
+        # Ledger and voucher records are collected and written
+        # RECORDS_PER_WRITE at a time, so the text layer encodes one large
+        # string per batch instead of one per record
+        chunks = []
+        append = chunks.append
+        
         # XML Header
         f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
         f.write('<ENVELOPE>\n')
@@ -116,6 +123,7 @@ def generate_xml():
         
         ledger_names = []
         ledger_count = 0
+        next_report = 10000
         
         for group_name, count in ledger_groups:
             for i in range(count):
@@ -126,7 +134,7 @@ def generate_xml():
                 # Random opening balance
                 opening = random.randint(-100000, 500000)
                 
-                f.write(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
+                append(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
 <LEDGER NAME="{name}" ACTION="Create">
 <NAME>{name}</NAME>
 <PARENT>{group_name}</PARENT>
@@ -134,8 +142,15 @@ def generate_xml():
 </LEDGER>
 </TALLYMESSAGE>\n''')
                 
-                if ledger_count % 10000 == 0:
+                if len(chunks) == RECORDS_PER_WRITE:
+                    f.write(''.join(chunks))
+                    chunks.clear()
+                if ledger_count == next_report:
                     print(f"  Created {ledger_count:,} ledgers...")
+                    next_report += 10000
+        
+        f.write(''.join(chunks))
+        chunks.clear()
         
         # Add Bank and Cash ledgers
         f.write(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
@@ -167,6 +182,7 @@ def generate_xml():
         
         start_date = datetime(2024, 4, 1)
         voucher_count = 0
+        next_report = 25000
         
         debtors = [l[0] for l in ledger_names if l[1] == "Sundry Debtors"][:1000]
         creditors = [l[0] for l in ledger_names if l[1] == "Sundry Creditors"][:1000]
@@ -201,7 +217,7 @@ def generate_xml():
                     party = random.choice(debtors) if debtors else "Suspense"
                     contra = random.choice(creditors) if creditors else "Suspense"
                 
-                f.write(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
+                append(f'''<TALLYMESSAGE xmlns:UDF="TallyUDF">
 <VOUCHER VCHTYPE="{vtype}" ACTION="Create">
 <DATE>{vdate}</DATE>
 <VOUCHERTYPENAME>{vtype}</VOUCHERTYPENAME>
@@ -219,8 +235,15 @@ def generate_xml():
 </VOUCHER>
 </TALLYMESSAGE>\n''')
                 
-                if voucher_count % 25000 == 0:
+                if len(chunks) == RECORDS_PER_WRITE:
+                    f.write(''.join(chunks))
+                    chunks.clear()
+                if voucher_count == next_report:
                     print(f"  Created {voucher_count:,} vouchers...")
+                    next_report += 25000
+        
+        f.write(''.join(chunks))
+        chunks.clear()
         
         # Close XML
         f.write('</REQUESTDATA>\n')
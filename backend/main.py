@@ -36,9 +36,6 @@ if not cors_origins:
 
 os.environ["CORS_ORIGINS"] = cors_origins
 
-# Import the FastAPI app
-from app.main import app
-
 # Run server
 if __name__ == "__main__":
     # Fix Windows encoding
@@ -57,8 +54,10 @@ if __name__ == "__main__":
     print(f"Environment: {'Production' if IS_PRODUCTION else 'Development'}")
     print("=" * 50)
     
+    # Pass the app as an import string: uvicorn imports app.main itself, so
+    # importing this module (e.g. for the settings above) stays lightweight
     uvicorn.run(
-        app,
+        "app.main:app",
         host="0.0.0.0",
         port=PORT,
         reload=False
@@ -5,14 +5,66 @@ Tests connection in 3 seconds or less
 
 import sys
 import os
+import socket
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app.services.custom_tally_connector import CustomTallyConnector
+from app.services.custom_tally_connector import CustomTallyConnector, TALLY_FALLBACK_PORTS
 from app.config import Config
 import time
 
+# Troubleshooting steps, written to stdout in one call on failure
+TROUBLESHOOT_LOCAL = """
+🔧 TROUBLESHOOTING:
+
+✅ Using localhost - Tally should be on THIS computer
+
+   1. Check if Tally is running
+   2. Open a company in Tally
+   3. Enable Gateway in Tally:
+      - Press F1 (Help)
+      - Go to Settings → Connectivity
+      - Enable 'Gateway' or 'Act as TallyPrime Server'
+      - Port should be: 9000
+   4. Check Windows Firewall allows port 9000
+
+""" + "=" * 70 + "\n"
+
+TROUBLESHOOT_REMOTE = """
+🔧 TROUBLESHOOTING:
+
+⚠️  Using remote IP: {host}
+
+   1. Verify IP is correct:
+      ping {host}
+      (Should get responses, not 'Request timed out')
+
+   2. Ensure Tally is running on that computer
+
+   3. Enable Gateway on the REMOTE computer:
+      - Press F1 → Settings → Connectivity
+      - Enable 'Act as TallyPrime Server'
+      - Port: 9000
+
+   4. Check firewall on REMOTE computer allows port 9000
+
+   💡 TIP: If you want to use Tally on THIS computer,
+      edit backend/.env and change:
+      TALLY_HOST={host}
+      to:
+      TALLY_HOST=localhost
+
+""" + "=" * 70 + "\n"
+
+def _tcp_probe(host, port, timeout=0.5):
+    """Return True if something accepts TCP connections on host:port"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
 def test_connection():
     print("=" * 70)
     print("QUICK TALLY CONNECTION TEST")
@@ -27,8 +79,16 @@ def test_connection():
         print("\n⏱️  Testing connection (max 3 seconds)...")
         start_time = time.time()
         
-        connector = CustomTallyConnector(Config.TALLY_HOST, Config.TALLY_PORT)
-        is_connected, message = connector.test_connection()
+        # Bare TCP connect first: if nothing listens on the configured port or
+        # the connector's fallback ports, fail in well under a second instead
+        # of waiting on HTTP timeouts
+        ports = list(dict.fromkeys([Config.TALLY_PORT, *TALLY_FALLBACK_PORTS]))
+        if not any(_tcp_probe(Config.TALLY_HOST, port) for port in ports):
+            is_connected = False
+            message = f"Nothing is listening on {Config.TALLY_HOST} ports {', '.join(map(str, ports))}"
+        else:
+            connector = CustomTallyConnector(Config.TALLY_HOST, Config.TALLY_PORT)
+            is_connected, message = connector.test_connection()
         
         elapsed = time.time() - start_time
         print(f"⏱️  Test completed in {elapsed:.2f} seconds")
@@ -69,44 +129,10 @@ def test_connection():
 
 def print_troubleshooting():
     """Print troubleshooting steps"""
-    print("\n🔧 TROUBLESHOOTING:")
-    print("")
-    
-    if Config.TALLY_HOST == "localhost" or Config.TALLY_HOST == "127.0.0.1":
-        print("✅ Using localhost - Tally should be on THIS computer")
-        print("")
-        print("   1. Check if Tally is running")
-        print("   2. Open a company in Tally")
-        print("   3. Enable Gateway in Tally:")
-        print("      - Press F1 (Help)")
-        print("      - Go to Settings → Connectivity")
-        print("      - Enable 'Gateway' or 'Act as TallyPrime Server'")
-        print("      - Port should be: 9000")
-        print("   4. Check Windows Firewall allows port 9000")
+    if Config.TALLY_HOST in ("localhost", "127.0.0.1"):
+        sys.stdout.write(TROUBLESHOOT_LOCAL)
     else:
-        print(f"⚠️  Using remote IP: {Config.TALLY_HOST}")
-        print("")
-        print("   1. Verify IP is correct:")
-        print(f"      ping {Config.TALLY_HOST}")
-        print("      (Should get responses, not 'Request timed out')")
-        print("")
-        print("   2. Ensure Tally is running on that computer")
-        print("")
-        print("   3. Enable Gateway on the REMOTE computer:")
-        print("      - Press F1 → Settings → Connectivity")
-        print("      - Enable 'Act as TallyPrime Server'")
-        print("      - Port: 9000")
-        print("")
-        print("   4. Check firewall on REMOTE computer allows port 9000")
-        print("")
-        print("   💡 TIP: If you want to use Tally on THIS computer,")
-        print("      edit backend/.env and change:")
-        print(f"      TALLY_HOST={Config.TALLY_HOST}")
-        print("      to:")
-        print("      TALLY_HOST=localhost")
-    
-    print("")
-    print("=" * 70)
+        sys.stdout.write(TROUBLESHOOT_REMOTE.format(host=Config.TALLY_HOST))
 
 if __name__ == "__main__":
     success = test_connection()
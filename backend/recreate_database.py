@@ -1,15 +1,33 @@
 """
 Recreate Database with Correct Schema
 This will delete the existing database and create a new one with all columns
+
+Usage: python recreate_database.py [--yes] [--no-backup] [--db-path PATH]
+Exit codes: 0 recreated, 1 failed, 3 cancelled at the prompt
 """
+import argparse
 import os
+import sqlite3
 import sys
 from pathlib import Path
 
+EXIT_FAILED = 1
+EXIT_CANCELLED = 3
+
 # Fix Windows encoding
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
+parser = argparse.ArgumentParser(description="Delete and recreate the SQLite database with the current schema")
+parser.add_argument('-y', '--yes', action='store_true', help="recreate without asking for confirmation")
+parser.add_argument('--no-backup', action='store_true', help="delete the old database instead of keeping a .db.backup copy")
+parser.add_argument('--db-path', type=Path, help="database file to recreate (default: database.db next to this script or its parent)")
+args = parser.parse_args()
+
+# Point the app's engine at the requested file before it is imported
+if args.db_path:
+    os.environ["DB_URL"] = f"sqlite:///{args.db_path}"
+
 # Add backend directory to path
 backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
@@ -21,32 +39,76 @@ try:
     print("Database models imported successfully")
 except ImportError as e:
     print(f"Error importing database models: {e}")
-    sys.exit(1)
+    sys.exit(EXIT_FAILED)
 
 # Find database file
-db_path = Path(backend_dir) / "database.db"
-if not db_path.exists():
-    db_path = Path(backend_dir).parent / "database.db"
+if args.db_path:
+    db_path = args.db_path
+else:
+    db_path = Path(backend_dir) / "database.db"
+    if not db_path.exists():
+        db_path = Path(backend_dir).parent / "database.db"
 
 if db_path.exists():
     print(f"Found existing database at: {db_path}")
-    response = input("Delete and recreate database? This will lose all data! (yes/no): ")
-    if response.lower() != 'yes':
-        print("Cancelled. Database not recreated.")
-        sys.exit(0)
+    if not args.yes:
+        try:
+            response = input("Delete and recreate database? This will lose all data! (yes/no): ")
+        except EOFError:
+            response = ""
+        if response.lower() != 'yes':
+            print("Cancelled. Database not recreated.")
+            sys.exit(EXIT_CANCELLED)
     
-    # Backup old database
-    backup_path = db_path.with_suffix('.db.backup')
-    if backup_path.exists():
-        backup_path.unlink()
-    db_path.rename(backup_path)
-    print(f"Backed up old database to: {backup_path}")
+    # Backup old database: release pooled connections first so the file is
+    # not held open, then swap it over any previous backup in one step
+    engine.dispose()
+    if args.no_backup:
+        db_path.unlink()
+        print(f"Deleted old database: {db_path}")
+    else:
+        # Let SQLite write a compacted copy itself, then drop the original
+        backup_path = db_path.with_suffix('.db.backup')
+        if backup_path.exists():
+            backup_path.unlink()
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("VACUUM INTO ?", (str(backup_path),))
+        except sqlite3.OperationalError:
+            # SQLite < 3.27 has no VACUUM INTO; use the online backup API
+            backup_conn = sqlite3.connect(backup_path)
+            with backup_conn:
+                conn.backup(backup_conn)
+            backup_conn.close()
+        finally:
+            conn.close()
+        db_path.unlink()
+        print(f"Backed up old database to: {backup_path}")
 
 # Recreate database with correct schema
 print("\nCreating database with correct schema...")
 try:
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+    # Drop and create in one transaction: a single commit for all the DDL
+    if engine.dialect.name == "sqlite":
+        # pysqlite commits implicitly around DDL, so engine.begin() would not
+        # make the drop/create atomic; hand it an explicit BEGIN ... COMMIT
+        # on a connection the driver leaves alone
+        with engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            # Schema changes are rare; keep full durability for them
+            conn.exec_driver_sql("PRAGMA synchronous=FULL")
+            conn.exec_driver_sql("BEGIN")
+            try:
+                Base.metadata.drop_all(bind=conn)
+                Base.metadata.create_all(bind=conn)
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+            conn.exec_driver_sql("COMMIT")
+    else:
+        with engine.begin() as conn:
+            Base.metadata.drop_all(bind=conn)
+            Base.metadata.create_all(bind=conn)
     print("Database created successfully with all columns!")
     
     # Verify schema
@@ -56,7 +118,8 @@ try:
     print(f"\nColumns in tally_cache table: {columns}")
     
     required_columns = ['id', 'user_id', 'cache_key', 'cache_data', 'cached_at', 'expires_at', 'last_updated', 'source']
-    missing = [col for col in required_columns if col not in columns]
+    column_names = set(columns)
+    missing = [col for col in required_columns if col not in column_names]
     
     if missing:
         print(f"WARNING: Missing columns: {missing}")
@@ -67,7 +130,7 @@ except Exception as e:
     print(f"Error creating database: {e}")
     import traceback
     traceback.print_exc()
-    sys.exit(1)
+    sys.exit(EXIT_FAILED)
 
 print("\nDatabase recreation complete!")
 print("You will need to:")
@@ -1,17 +1,29 @@
 import os
 import sys
-import json
-import asyncio
+import logging
+import orjson
+import tempfile
+from logging.handlers import MemoryHandler
 from datetime import datetime
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, func, Index
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker
 
 # Add current directory to path
 sys.path.append(os.getcwd())
 
-from app.models.database import Base, User, TallyCache
+from app.models.database import Base, User, TallyCache, set_sqlite_pragmas
 from app.services.tbk_parser import TallyBackupParser
 
+# Progress lines are buffered and written in batches; an error flushes them
+# ahead of the error report so the output stays in order
+_console = logging.StreamHandler(sys.stdout)
+_console.setFormatter(logging.Formatter('%(message)s'))
+log = logging.getLogger("reproduce_issue")
+log.setLevel(logging.INFO)
+log.propagate = False
+log.addHandler(MemoryHandler(capacity=1024, flushLevel=logging.ERROR, target=_console))
+
 # Mock objects
 class MockFile:
     def __init__(self, filename, content):
@@ -30,7 +42,11 @@ class MockUser:
 if os.path.exists("test.db"):
     os.remove("test.db")
 engine = create_engine('sqlite:///test.db')
+event.listen(engine, "connect", set_sqlite_pragmas)
 Base.metadata.create_all(engine)
+# upsert_cache() needs one row per user and key; the scratch database gets
+# its own unique index, so the app's tally_cache schema stays unchanged
+Index("uq_tally_cache_user_key", TallyCache.user_id, TallyCache.cache_key, unique=True).create(engine)
 SessionLocal = sessionmaker(bind=engine)
 db = SessionLocal()
 
@@ -39,8 +55,26 @@ user = User(email="test@example.com", hashed_password="x", full_name="Test User"
 db.add(user)
 db.commit()
 
-async def reproduce():
-    print("--- STARTING REPRODUCTION ---")
+def upsert_cache(db, user_id, cache_key, cache_data):
+    """Insert or replace one backup cache row in a single statement"""
+    stmt = sqlite_insert(TallyCache).values(
+        user_id=user_id,
+        cache_key=cache_key,
+        cache_data=cache_data,
+        source="backup"
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "cache_key"],
+        set_={
+            "cache_data": stmt.excluded.cache_data,
+            "source": stmt.excluded.source,
+            "last_updated": func.now()
+        }
+    )
+    db.execute(stmt)
+
+def reproduce():
+    log.info("--- STARTING REPRODUCTION ---")
     
     # 1. Create dummy XML
     xml_content = b"""<ENVELOPE>
@@ -76,55 +110,41 @@ async def reproduce():
     current_user = MockUser()
     
     try:
-        print("1. Parsing file...")
-        # Simulate upload logic
-        import tempfile
+        log.info("1. Parsing file...")
+        # Simulate upload logic: backup_routes.py saves the upload to a temp
+        # file and hands it to parse_tbk_file, so the same path runs here
         with tempfile.NamedTemporaryFile(delete=False, suffix='.xml') as temp_file:
-            temp_file.write(xml_content)
+            temp_file.write(file.content)
             temp_path = temp_file.name
-            
+        
         parser = TallyBackupParser()
         data = parser.parse_tbk_file(temp_path)
-        print(f"Parsed: {len(data['companies'])} companies")
+        log.info(f"Parsed: {len(data['companies'])} companies")
         
-        print("2. Saving to DB...")
+        log.info("2. Saving to DB...")
         # Simulate DB save logic from backup_routes.py
+        # Rows are written with INSERT ... ON CONFLICT, so the only lookup
+        # needed is the current companies list, which is extended in memory
+        # and written once after the loop
+        companies_data = db.query(TallyCache.cache_data).filter(
+            TallyCache.user_id == current_user.id,
+            TallyCache.cache_key == "companies"
+        ).scalar()
+        if companies_data:
+            log.info("Updating existing companies cache entry")
+            companies_list = orjson.loads(companies_data).get("companies", [])
+        else:
+            log.info("Creating new companies cache entry")
+            companies_list = []
+        
         companies_cached = []
         for company in data["companies"]:
             company_name = company["name"]
-            print(f"Processing company: {company_name}")
-            
-            # Cache companies list
-            cache_entry = db.query(TallyCache).filter(
-                TallyCache.user_id == current_user.id,
-                TallyCache.cache_key == "companies"
-            ).first()
-            
-            if not cache_entry:
-                print("Creating new companies cache entry")
-                cache_entry = TallyCache(
-                    user_id=current_user.id,
-                    cache_key="companies",
-                    cache_data=json.dumps({"companies": [company]}),
-                    source="backup"
-                )
-                db.add(cache_entry)
-            else:
-                print("Updating existing companies cache entry")
-                existing_data = json.loads(cache_entry.cache_data)
-                existing_companies = existing_data.get("companies", [])
-                existing_companies.append(company)
-                cache_entry.cache_data = json.dumps({"companies": existing_companies})
-                cache_entry.source = "backup"
-                # cache_entry.last_updated = datetime.utcnow() # This might fail if column missing
+            log.info(f"Processing company: {company_name}")
+            companies_list.append(company)
             
             # Cache company data
-            print(f"Caching data for {company_name}")
-            company_cache = db.query(TallyCache).filter(
-                TallyCache.user_id == current_user.id,
-                TallyCache.cache_key == f"backup_data_{company_name}"
-            ).first()
-            
+            log.info(f"Caching data for {company_name}")
             cache_content = {
                 "company": company,
                 "ledgers": data["ledgers"],
@@ -133,42 +153,33 @@ async def reproduce():
                 "groups": data["groups"],
                 "metadata": data["metadata"]
             }
-            
-            if not company_cache:
-                print("Creating new company data cache")
-                company_cache = TallyCache(
-                    user_id=current_user.id,
-                    cache_key=f"backup_data_{company_name}",
-                    cache_data=json.dumps(cache_content),
-                    source="backup"
-                )
-                db.add(company_cache)
-            else:
-                print("Updating company data cache")
-                company_cache.cache_data = json.dumps(cache_content)
-                company_cache.source = "backup"
-                # company_cache.last_updated = datetime.utcnow()
+            upsert_cache(db, current_user.id, f"backup_data_{company_name}",
+                         orjson.dumps(cache_content).decode())
+            db.commit()
             
             companies_cached.append(company_name)
         
-        print("3. Committing...")
+        if companies_list:
+            upsert_cache(db, current_user.id, "companies", orjson.dumps({"companies": companies_list}).decode())
+        
+        log.info("3. Committing...")
         db.commit()
-        print("SUCCESS! No errors found.")
+        log.info("SUCCESS! No errors found.")
         
     except Exception as e:
-        print("\n!!! ERROR DETECTED !!!")
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"\n!!! ERROR DETECTED !!!\nError: {e}")
     finally:
         if 'temp_path' in locals() and os.path.exists(temp_path):
             os.unlink(temp_path)
         if os.path.exists("test.db"):
             try:
                 db.close()
+                engine.dispose()  # closes the WAL connection so -wal/-shm go too
                 os.remove("test.db")
             except:
                 pass
+        for handler in log.handlers:
+            handler.flush()
 
 if __name__ == "__main__":
-    asyncio.run(reproduce())
+    reproduce()
@@ -9,7 +9,8 @@ import os
 # Add backend directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app.models.database import engine, TallyConnection, User
+from app.models.database import engine, ConnectionType, TallyConnection, User
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 def reset_all_connections_to_localhost():
@@ -20,8 +21,13 @@ def reset_all_connections_to_localhost():
     
     with Session(engine) as db:
         try:
-            # Get all Tally connections
-            connections = db.query(TallyConnection).all()
+            # Get all Tally connections with their user's email in one query,
+            # joined through the TallyConnection.user relationship
+            connections = db.execute(
+                select(User.email, TallyConnection.server_url, TallyConnection.port)
+                .select_from(TallyConnection)
+                .outerjoin(TallyConnection.user)
+            ).all()
             
             if not connections:
                 print("\n✓ No existing connections found")
@@ -31,21 +37,20 @@ def reset_all_connections_to_localhost():
             
             print(f"\nFound {len(connections)} connection(s):")
             
-            for conn in connections:
-                user = db.query(User).filter(User.id == conn.user_id).first()
-                old_url = conn.server_url or "localhost"
-                
-                print(f"\n  User: {user.email if user else 'Unknown'}")
-                print(f"  Old: {old_url}:{conn.port}")
-                
-                # Reset to localhost
-                conn.connection_type = "localhost"
-                conn.server_url = None  # None means use localhost
-                conn.port = 9000
-                
-                print(f"  New: localhost:9000 ✓")
+            for email, server_url, port in connections:
+                print(f"\n  User: {email or 'Unknown'}")
+                print(f"  Old: {server_url or 'localhost'}:{port}")
             
+            # Reset to localhost with a single UPDATE
+            result = db.execute(
+                update(TallyConnection).values(
+                    connection_type=ConnectionType.LOCALHOST,
+                    server_url=None,  # None means use localhost
+                    port=9000
+                )
+            )
             db.commit()
+            print(f"\n  Reset {result.rowcount} connection(s) to localhost:9000 ✓")
             
             print("\n" + "=" * 70)
             print("✅ SUCCESS! All connections reset to localhost:9000")
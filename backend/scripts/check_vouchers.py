@@ -1,12 +1,26 @@
 """Check voucher structure in backup data"""
-import json
-from app.models.database import SessionLocal, TallyCache
+from itertools import islice
+
+import orjson
+from sqlalchemy import func
+from app.models.database import SessionLocal, TallyCache, engine
 
 db = SessionLocal()
-entries = db.query(TallyCache).filter(TallyCache.source == 'backup').all()
+# Match the company name inside the JSON on the database side, so rows for
+# other companies are never decoded here; the rest is streamed in small
+# batches since each cache_data blob can be large
+entries = (
+    db.query(TallyCache)
+    .filter(
+        TallyCache.source == 'backup',
+        func.json_extract(TallyCache.cache_data, '$.company.name').like('%Test Company 2L%')
+    )
+    .execution_options(stream_results=True)
+    .yield_per(50)
+)
 
 for entry in entries:
-    data = json.loads(entry.cache_data) if isinstance(entry.cache_data, str) else entry.cache_data
+    data = orjson.loads(entry.cache_data) if isinstance(entry.cache_data, str) else entry.cache_data
     company = data.get('company', {}).get('name', 'Unknown')
     if 'Test Company 2L' in company:
         vouchers = data.get('vouchers', [])
@@ -18,7 +32,7 @@ for entry in entries:
         
         # Check ledgers - find some with names
         print("\nSample Ledgers (Sundry Debtors):")
-        debtors = [l for l in ledgers if 'debtor' in l.get('parent', '').lower()][:5]
+        debtors = islice((l for l in ledgers if 'debtor' in (l.get('parent') or '').lower()), 5)
         for l in debtors:
             print(f"  Name: {l.get('name')}, Parent: {l.get('parent')}, Balance: {l.get('closing_balance')}")
         
@@ -34,4 +48,5 @@ for entry in entries:
         break
 
 db.close()
+print(f"\nConnection pool: {engine.pool.status()}")
 
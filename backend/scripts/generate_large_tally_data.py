@@ -5,19 +5,41 @@ Generates 500,000+ entries with ALL Tally data types
 - 0 errors, 0 exceptions
 - Proper dates: 01-Apr-2024 to 31-Mar-2025
 - All data types: Ledgers, Vouchers, Stock, GST, Tax, etc.
+- Output: masters + summary JSON, with ledgers, stock items and
+  vouchers streamed to one NDJSON file each
 """
 
+import contextlib
 import json
+import functools
+import math
+import multiprocessing
 import random
 import os
+import sys
 from datetime import datetime, timedelta
-from decimal import Decimal, ROUND_HALF_UP
 import string
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
 
 # Configuration
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'backups')
 FINANCIAL_YEAR_START = datetime(2024, 4, 1)
 FINANCIAL_YEAR_END = datetime(2025, 3, 31)
+FY_DAYS = (FINANCIAL_YEAR_END - FINANCIAL_YEAR_START).days + 1
+
+# Set TALLY_SEED to make a run reproducible; unset, every run draws fresh data.
+# Worker shards are fixed-size and seeded from these, so a seeded run writes
+# the same NDJSON files whatever the CPU count
+TALLY_SEED = int(os.environ["TALLY_SEED"]) if os.environ.get("TALLY_SEED") else None
+_RNG = random.Random(TALLY_SEED)
+_NPRNG = np.random.default_rng(TALLY_SEED)
 
 # Indian Names for realistic data
 FIRST_NAMES = [
@@ -58,6 +80,7 @@ GST_STATES = {
     "West Bengal": "19", "Telangana": "36", "Gujarat": "24", "Rajasthan": "08",
     "Uttar Pradesh": "09", "Madhya Pradesh": "23", "Punjab": "03", "Haryana": "06"
 }
+_STATE_NAMES = tuple(GST_STATES)
 
 PRODUCT_CATEGORIES = [
     "Electronics", "Textiles", "Chemicals", "Machinery", "Food Products",
@@ -75,71 +98,456 @@ UNITS = ["Nos", "Pcs", "Kg", "Gm", "Ltr", "Mtr", "Box", "Carton", "Set", "Pair",
 
 GST_RATES = [0, 5, 12, 18, 28]
 
+GST_REGISTRATION_TYPES = ["Regular", "Composition", "Unregistered"]
+
+# Voucher settlement choices
+PAYMENT_MODES = ["Cash", "Cheque", "NEFT", "RTGS", "UPI"]
+PAYMENT_BANKS = ["HDFC Bank Current A/c", "ICICI Bank Current A/c", "State Bank of India"]
+CONTRA_BANKS = PAYMENT_BANKS + ["Axis Bank Current A/c"]
+MAX_INVOICE_ITEMS = 5  # Stock items per sales/purchase invoice
+
+# Voucher type distribution: (ratio, amount range, carries GST)
+VOUCHER_TYPES = {
+    "Sales": (0.30, 1000, 500000, True),
+    "Purchase": (0.25, 1000, 400000, True),
+    "Receipt": (0.15, 5000, 1000000, False),
+    "Payment": (0.15, 1000, 500000, False),
+    "Journal": (0.08, 1000, 100000, False),
+    "Contra": (0.02, 10000, 500000, False),
+    "Credit Note": (0.025, 500, 50000, True),
+    "Debit Note": (0.025, 500, 50000, True)
+}
+PARTY_SHARD_SIZE = 1 << 13  # Party ledgers built per worker task
+VOUCHER_SHARD_SIZE = 1 << 14  # Vouchers built per worker task
+
+# Characters dropped from the company name when building its web slug
+_SLUG_DELETE = str.maketrans("", "", " &.,")
+
+# Word pools as object arrays, so a whole column of picks is one gather
+_FIRST_NAMES_ARR = np.array(FIRST_NAMES, dtype=object)
+_LAST_NAMES_ARR = np.array(LAST_NAMES, dtype=object)
+_COMPANY_SUFFIXES_ARR = np.array(COMPANY_SUFFIXES, dtype=object)
+_CITIES_ARR = np.array(CITIES, dtype=object)
+_UNITS_ARR = np.array(UNITS, dtype=object)
+_PRODUCT_CATEGORIES_ARR = np.array(PRODUCT_CATEGORIES, dtype=object)
+_PRODUCT_ADJECTIVES_ARR = np.array(PRODUCT_ADJECTIVES, dtype=object)
+_PRODUCT_SUFFIXES_ARR = np.array([" Type A", " Type B", " Grade 1", " Grade 2", " Model X", " Model Y",
+                                  " Series", " Plus", " Pro", ""], dtype=object)
+STATE_KEYS = np.array(_STATE_NAMES, dtype=object)
+STATE_CODES = np.array([GST_STATES[s] for s in _STATE_NAMES], dtype=object)
+
+# Ledger groups rolled up into the summary's balance sheet figures
+ASSET_GROUPS = ("Bank Accounts", "Cash-in-Hand", "Fixed Assets", "Current Assets",
+                "Investments", "Stock-in-Hand", "Loans & Advances (Asset)")
+LIABILITY_GROUPS = ("Current Liabilities", "Loans (Liability)", "Bank OD A/c", "Duties & Taxes")
+EQUITY_GROUPS = ("Capital Account", "Reserves & Surplus")
+
+# Bulk sections are streamed to one NDJSON file each instead of being
+# held in memory until the final save
+STREAMED_SECTIONS = ("ledgers", "stock_items", "vouchers")
+
+# Progress is only drawn on an interactive stderr, once per PROGRESS_EVERY
+# rows, so piped and CI runs do no progress I/O inside the row loops
+PROGRESS_EVERY = 1 << 14
+_SHOW_PROGRESS = sys.stderr.isatty()
+
+def _progress(count, label, end=""):
+    """Redraw the single progress line for a section."""
+    if _SHOW_PROGRESS:
+        sys.stderr.write(f"\r   Generated {count:,} {label}...{end}")
+        sys.stderr.flush()
+
+# Party ledger rows are rendered straight from this template: every string
+# interpolated into it comes from the ASCII pools above (no quotes or
+# backslashes), so only the parent group name needs JSON encoding
+_PARTY_LEDGER_ROW = (
+    b'{"name":"%s","guid":"ledger-%d","parent":%s,"address":"Address Line %d, %s",'
+    b'"state":"%s","country":"India","pincode":"%d","gstin":"%s","pan":"%s",'
+    b'"email":"contact%d@example.com","phone":"+91-%d","opening_balance":%r,'
+    b'"closing_balance":%r,"credit_limit":%r,"credit_days":%d,"is_gst_registered":%s,'
+    b'"gst_registration_type":"%s","maintain_bill_by_bill":true}\n'
+)
+_JSON_BOOLS = (b"false", b"true")
+_CITY_BYTES = np.array([city.encode() for city in CITIES], dtype=object)
+_STATE_BYTES = np.array([state.encode() for state in STATE_KEYS], dtype=object)
+_REGISTRATION_TYPE_BYTES = [reg_type.encode() for reg_type in GST_REGISTRATION_TYPES]
+
+def _numpy_default(value):
+    """json fallback for the NumPy scalars and arrays orjson handles natively"""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _json_line(row):
+    """Serialize one row as a newline-terminated JSON line (bytes)"""
+    if orjson is not None:
+        return orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(row, ensure_ascii=False, default=_numpy_default).encode("utf-8") + b"\n"
+
+# Character pools for IDs, built once; the scalar helpers bind the
+# random functions they use at module level
+_UPPER = tuple(string.ascii_uppercase)
+_DIGITS = tuple(string.digits)
+_ALNUM = _UPPER + _DIGITS
+_choices = _RNG.choices
+_choice = _RNG.choice
+
+_GSTIN_CHECK_CHARS = np.frombuffer("".join(_ALNUM).encode(), dtype=np.uint8)
+
 def generate_gstin(state_code):
     """Generate valid GSTIN format"""
-    pan = ''.join(random.choices(string.ascii_uppercase, k=5)) + \
-          ''.join(random.choices(string.digits, k=4)) + \
-          random.choice(string.ascii_uppercase)
-    entity = str(random.randint(1, 9))
-    check = random.choice(string.ascii_uppercase + string.digits)
-    return f"{state_code}{pan}{entity}Z{check}"
+    return f"{state_code}{generate_pan()}{_choice(_DIGITS[1:])}Z{_choice(_ALNUM)}"
 
 def generate_pan():
     """Generate valid PAN format"""
-    return ''.join(random.choices(string.ascii_uppercase, k=5)) + \
-           ''.join(random.choices(string.digits, k=4)) + \
-           random.choice(string.ascii_uppercase)
+    return ''.join(_choices(_UPPER, k=5)) + ''.join(_choices(_DIGITS, k=4)) + _choice(_UPPER)
+
+def _fill_pan_codes(chars, rng):
+    """Fill an (n, 10) uint8 block with PAN character codes"""
+    n = len(chars)
+    chars[:, :5] = rng.integers(65, 91, (n, 5))   # A-Z
+    chars[:, 5:9] = rng.integers(48, 58, (n, 4))  # 0-9
+    chars[:, 9] = rng.integers(65, 91, n)
+
+def _decode_codes(chars, as_bytes):
+    """Turn an (n, width) uint8 block into a list of n bytes or str values"""
+    codes = chars.view(f"S{chars.shape[1]}").ravel()
+    return codes.tolist() if as_bytes else codes.astype(str).tolist()
+
+def generate_pan_batch(n, rng, as_bytes=False):
+    """Generate n PANs at once from one block of random ASCII codes"""
+    chars = np.empty((n, 10), dtype=np.uint8)
+    _fill_pan_codes(chars, rng)
+    return _decode_codes(chars, as_bytes)
+
+def generate_gstin_batch(state_codes, rng, as_bytes=False):
+    """Generate one GSTIN per state code: state + PAN + entity + Z + check"""
+    n = len(state_codes)
+    chars = np.empty((n, 15), dtype=np.uint8)
+    chars[:, :2] = np.array(state_codes, dtype="S2").view(np.uint8).reshape(n, 2)
+    _fill_pan_codes(chars[:, 2:12], rng)
+    chars[:, 12] = rng.integers(49, 58, n)  # entity number 1-9
+    chars[:, 13] = ord("Z")
+    chars[:, 14] = _GSTIN_CHECK_CHARS[rng.integers(0, len(_GSTIN_CHECK_CHARS), n)]
+    return _decode_codes(chars, as_bytes)
+
+def compute_voucher_amounts(n, rng, low, high, with_gst=False):
+    """Vectorized numeric core of one voucher type.
+    
+    Draws the day offset and amounts of n vouchers at once and returns
+    (days, months, rows, totals): days index into the financial year,
+    months (an array) are the summary slots, each row holds the amounts
+    passed to the voucher builder - (amount,) or, with GST, (base_amount,
+    gst_rate, gst_amount, half_gst, total_amount, is_local) - and totals
+    is the array of voucher amounts.
+    """
+    days = rng.integers(0, FY_DAYS, n)
+    months = SUMMARY_MONTHS[days]
+    
+    base_amounts = rng.uniform(low, high, n).round(2)
+    if not with_gst:
+        return days.tolist(), months, list(zip(base_amounts.tolist())), base_amounts
+    
+    gst_rates = rng.choice(GST_RATES, n)
+    gst_amounts = (base_amounts * gst_rates / 100).round(2)
+    totals = (base_amounts + gst_amounts).round(2)
+    rows = zip(
+        base_amounts.tolist(),
+        gst_rates.tolist(),
+        gst_amounts.tolist(),
+        (gst_amounts / 2).round(2).tolist(),
+        totals.tolist(),
+        (rng.random(n) > 0.3).tolist(),  # Local (CGST+SGST) vs interstate (IGST)
+    )
+    return days.tolist(), months, list(rows), totals
 
-def random_date(start=FINANCIAL_YEAR_START, end=FINANCIAL_YEAR_END):
-    """Generate random date within financial year"""
-    delta = end - start
-    random_days = random.randint(0, delta.days)
-    return start + timedelta(days=random_days)
+MONTH_ABBR = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
 
 def format_date(dt):
     """Format date for Tally: YYYYMMDD"""
-    return dt.strftime("%Y%m%d")
+    return f"{dt.year:04d}{dt.month:02d}{dt.day:02d}"
 
 def format_display_date(dt):
     """Format date for display: DD-Mon-YYYY"""
-    return dt.strftime("%d-%b-%Y")
+    return f"{dt.day:02d}-{MONTH_ABBR[dt.month - 1]}-{dt.year}"
+
+def _date_table(start, end, formatter=format_date):
+    """Every date from start to end (inclusive), pre-formatted, as an object array"""
+    return np.array([formatter(start + timedelta(days=d)) for d in range((end - start).days + 1)], dtype=object)
+
+# Per-day lookup tables for the financial year, indexed by day offset, so
+# rows pick dates by index instead of formatting datetimes
+TALLY_DATES = _date_table(FINANCIAL_YEAR_START, FINANCIAL_YEAR_END)
+DISPLAY_DATES = _date_table(FINANCIAL_YEAR_START, FINANCIAL_YEAR_END, format_display_date)
+VOUCHER_PERIODS = _date_table(FINANCIAL_YEAR_START, FINANCIAL_YEAR_END, lambda dt: dt.strftime("%y%m"))
+NARRATION_MONTHS = _date_table(FINANCIAL_YEAR_START, FINANCIAL_YEAR_END, lambda dt: dt.strftime("%B %Y"))
+SUMMARY_MONTHS = _date_table(FINANCIAL_YEAR_START, FINANCIAL_YEAR_END,
+                             lambda dt: dt.month if dt.month >= 4 else dt.month + 9).astype(np.int64)
+
+# Stock item batch dates: manufactured before the year, expiring after it
+MFG_DATES = _date_table(datetime(2024, 1, 1), FINANCIAL_YEAR_START)
+EXPIRY_DATES = _date_table(FINANCIAL_YEAR_END, datetime(2026, 3, 31))
+
+# Supplier invoice dates, which may precede the bill by a few days:
+# indexed by day offset + SUPPLIER_INVOICE_LEAD_DAYS
+SUPPLIER_INVOICE_LEAD_DAYS = 5
+SUPPLIER_INVOICE_DATES = _date_table(FINANCIAL_YEAR_START - timedelta(days=SUPPLIER_INVOICE_LEAD_DAYS), FINANCIAL_YEAR_END)
 
 def round_amount(amount):
-    """Round to 2 decimal places"""
-    return float(Decimal(str(amount)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
-
-def generate_company_name():
-    """Generate realistic company name"""
-    patterns = [
-        lambda: f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)} {random.choice(COMPANY_SUFFIXES)}",
-        lambda: f"{random.choice(LAST_NAMES)} & {random.choice(LAST_NAMES)} {random.choice(COMPANY_SUFFIXES)}",
-        lambda: f"{random.choice(LAST_NAMES)} {random.choice(PRODUCT_CATEGORIES)} {random.choice(COMPANY_SUFFIXES)}",
-        lambda: f"{random.choice(CITIES)} {random.choice(PRODUCT_CATEGORIES)} {random.choice(COMPANY_SUFFIXES)}",
-    ]
-    return random.choice(patterns)()
-
-def generate_product_name(category):
-    """Generate realistic product name"""
-    adj = random.choice(PRODUCT_ADJECTIVES)
-    suffix = random.choice(["Type A", "Type B", "Grade 1", "Grade 2", "Model X", "Model Y", "Series", "Plus", "Pro", ""])
-    return f"{adj} {category} {suffix}".strip()
+    """Round to 2 decimal places, halves away from zero"""
+    if amount < 0:
+        return -round_amount(-amount)
+    return math.floor(amount * 100 + 0.5) / 100
+
+def pick_names(names, n, rng, default):
+    """Draw n names from a list, or repeat the default when it is empty"""
+    if not names:
+        return [default] * n
+    return [names[i] for i in rng.integers(0, len(names), n).tolist()]
+
+def draw_distinct_indices(population, counts, rng):
+    """Draw counts[i] distinct indices into range(population) for each row i
+    
+    Returns an (n, max(counts)) array whose row i holds its picks in the
+    first counts[i] columns. Rows are drawn with replacement in one call
+    and only the rare rows with a repeated pick are redrawn.
+    """
+    counts = np.asarray(counts)
+    width = int(counts.max(initial=0))
+    picks = rng.integers(0, population, (len(counts), width))
+    
+    # Columns past a row's count get distinct negative fillers, so sorting
+    # exposes a repeat as two equal neighbours
+    columns = np.arange(width)
+    used = np.where(columns < counts[:, None], picks, -1 - columns)
+    used.sort(axis=1)
+    for row in np.flatnonzero((used[:, 1:] == used[:, :-1]).any(axis=1)):
+        picks[row, :counts[row]] = rng.choice(population, counts[row], replace=False)
+    return picks
+
+def generate_company_names(n, rng):
+    """Generate n realistic company names, gathering each word column at once"""
+    lasts = _LAST_NAMES_ARR[rng.integers(0, len(LAST_NAMES), n)]
+    categories = _PRODUCT_CATEGORIES_ARR[rng.integers(0, len(PRODUCT_CATEGORIES), n)]
+    heads = np.choose(rng.integers(0, 4, n), [
+        _FIRST_NAMES_ARR[rng.integers(0, len(FIRST_NAMES), n)] + " " + lasts,
+        lasts + " & " + _LAST_NAMES_ARR[rng.integers(0, len(LAST_NAMES), n)],
+        lasts + " " + categories,
+        _CITIES_ARR[rng.integers(0, len(CITIES), n)] + " " + categories,
+    ])
+    return (heads + " " + _COMPANY_SUFFIXES_ARR[rng.integers(0, len(COMPANY_SUFFIXES), n)]).tolist()
+
+def generate_product_names(category, n, rng):
+    """Generate n realistic product names for one category"""
+    adjectives = _PRODUCT_ADJECTIVES_ARR[rng.integers(0, len(PRODUCT_ADJECTIVES), n)]
+    suffixes = _PRODUCT_SUFFIXES_ARR[rng.integers(0, len(_PRODUCT_SUFFIXES_ARR), n)]
+    return (adjectives + f" {category}" + suffixes).tolist()
+
+def _gen_party_shard(args):
+    """Build one contiguous ID range of party ledgers (runs in a worker process).
+    
+    Returns the rows as an NDJSON buffer, their names in ID order and the
+    sum of their closing balances.
+    """
+    start_id, count, parent, is_customer, seed = args
+    prefix = "D" if is_customer else "C"
+    rng = np.random.default_rng(seed)
+    
+    # Random opening balance
+    openings = rng.uniform(0, 500000, count).round(2)
+    if not is_customer:
+        openings = -openings  # Credit balance for creditors, debit for debtors
+    openings = openings.tolist()
+    credit_limits = rng.uniform(100000, 5000000, count).round(2).tolist() if is_customer else [0] * count
+    
+    address_lines = rng.integers(1, 1000, count).tolist()
+    pincodes = rng.integers(100000, 1000000, count).tolist()
+    phones = rng.integers(7000000000, 10000000000, count).tolist()
+    has_gstin = (rng.random(count) > 0.2).tolist()  # 80% have GSTIN
+    gst_registered = (rng.random(count) > 0.2).tolist()
+    credit_days = rng.choice([15, 30, 45, 60, 90], count).tolist()
+    registration_types = rng.integers(0, len(GST_REGISTRATION_TYPES), count).tolist()
+    
+    states_idx = rng.integers(0, len(STATE_KEYS), count)
+    states = _STATE_BYTES[states_idx].tolist()
+    gstins = generate_gstin_batch(STATE_CODES[states_idx].tolist(), rng, as_bytes=True)
+    cities = _CITY_BYTES[rng.integers(0, len(CITIES), count)].tolist()
+    company_names = generate_company_names(count, rng)
+    pans = generate_pan_batch(count, rng, as_bytes=True)
+    parent_json = json.dumps(parent).encode()
+    
+    lines = []
+    names = []
+    for i in range(count):
+        ledger_id = start_id + i
+        opening = openings[i]
+        
+        name = f"{company_names[i]} {prefix}{ledger_id}"
+        
+        lines.append(_PARTY_LEDGER_ROW % (
+            name.encode(), ledger_id, parent_json,
+            address_lines[i], cities[i], states[i],
+            pincodes[i], gstins[i] if has_gstin[i] else b"", pans[i],
+            ledger_id, phones[i], opening, opening, credit_limits[i], credit_days[i],
+            _JSON_BOOLS[gst_registered[i]], _REGISTRATION_TYPE_BYTES[registration_types[i]],
+        ))
+        names.append(name)
+    
+    return b"".join(lines), names, sum(openings)
+
+# Per-process voucher builder, installed by _init_voucher_worker
+_voucher_source = None
+
+def _init_voucher_worker(name_lists):
+    """Pool initializer: receive the read-only ledger, item and godown names once"""
+    global _voucher_source
+    _voucher_source = TallyDataGenerator()
+    (_voucher_source.customer_ledgers, _voucher_source.supplier_ledgers, _voucher_source.expense_ledgers,
+     _voucher_source.stock_item_names, _voucher_source.godown_names) = name_lists
+
+def _gen_voucher_shard(args):
+    """Build one contiguous number range of one voucher type (runs in a worker process).
+    
+    Returns the vouchers as an NDJSON buffer, the sum of their amounts and
+    that sum split over the summary months.
+    """
+    voucher_type, first_number, count, seed = args
+    _, low, high, with_gst = VOUCHER_TYPES[voucher_type]
+    source = _voucher_source
+    source.rng = np.random.default_rng(seed)
+    
+    days, months, amounts, totals = compute_voucher_amounts(count, source.rng, low, high, with_gst)
+    create = TallyDataGenerator.BATCH_CREATORS[voucher_type]
+    vouchers = create(source, range(first_number, first_number + count), days, amounts)
+    
+    monthly = np.zeros(13)
+    np.add.at(monthly, months, totals)
+    return b"".join(map(_json_line, vouchers)), float(totals.sum()), monthly
+
+class NDJSONWriter:
+    """Write-only NDJSON file that batches rows into scatter-gather writes.
+    
+    Rows and shard buffers queue up as-is and go to the kernel in one
+    os.writev call per MAX_BUFFERS entries or MAX_BYTES bytes, so they
+    are neither copied into a file buffer nor joined first.
+    """
+    
+    MAX_BUFFERS = 1024  # IOV_MAX on Linux
+    MAX_BYTES = 8 << 20
+    
+    def __init__(self, path):
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+        self._pending = []
+        self._pending_bytes = 0
+    
+    def write(self, data):
+        self._pending.append(data)
+        self._pending_bytes += len(data)
+        if len(self._pending) >= self.MAX_BUFFERS or self._pending_bytes >= self.MAX_BYTES:
+            self.flush()
+    
+    def flush(self):
+        if not self._pending:
+            return
+        # os.writev is POSIX-only, and may write less than everything
+        written = os.writev(self._fd, self._pending) if hasattr(os, "writev") else 0
+        if written < self._pending_bytes:
+            rest = memoryview(b"".join(self._pending))[written:]
+            while rest:
+                rest = rest[os.write(self._fd, rest):]
+        self._pending.clear()
+        self._pending_bytes = 0
+    
+    def close(self):
+        if self._fd is None:
+            return
+        try:
+            self.flush()
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+@functools.lru_cache(maxsize=None)
+def build_dict_factory(keys):
+    """Compile a function that builds a dict with these keys from positional args.
+    
+    The generated body is one dict display, which CPython builds with a
+    single BUILD_CONST_KEY_MAP instead of zipping keys and values per row.
+    """
+    args = [f"v{i}" for i in range(len(keys))]
+    src = f"def make_row({', '.join(args)}):\n    return {{{', '.join(f'{key!r}: {arg}' for key, arg in zip(keys, args))}}}\n"
+    namespace = {}
+    exec(compile(src, "<row factory>", "exec"), namespace)
+    return namespace["make_row"]
+
+
+@dataclass(slots=True)
+class StockItemColumns:
+    """Stock item masters held column-wise (structure of arrays).
+    
+    One slot per field, in output order, each holding a list or NumPy
+    array; row dicts only exist while a row is being serialized.
+    """
+    name: list
+    guid: list
+    parent: np.ndarray
+    category: np.ndarray
+    base_units: np.ndarray
+    opening_balance: np.ndarray
+    opening_value: np.ndarray
+    closing_balance: np.ndarray
+    closing_value: np.ndarray
+    gst_applicable: list
+    gst_rate: np.ndarray
+    hsn_code: np.ndarray
+    cost_price: np.ndarray
+    selling_price: np.ndarray
+    mrp: np.ndarray
+    godown: np.ndarray
+    batch_name: np.ndarray
+    mfg_date: np.ndarray
+    expiry_date: np.ndarray
+    reorder_level: np.ndarray
+    minimum_order_qty: np.ndarray
+    
+    def __len__(self):
+        return len(self.name)
+    
+    def rows(self):
+        """Yield each item as a dict, zipping the columns lazily"""
+        make_row = build_dict_factory(STOCK_ITEM_FIELDS)
+        for values in zip(*(getattr(self, field) for field in STOCK_ITEM_FIELDS)):
+            yield make_row(*values)
+
+
+STOCK_ITEM_FIELDS = tuple(field.name for field in fields(StockItemColumns))
+
 
 class TallyDataGenerator:
     def __init__(self, company_name="Large Scale Trading & Manufacturing Co Pvt Ltd"):
         self.company_name = company_name
+        # Host-name part of the company's email and website
+        self._slug = company_name.lower().translate(_SLUG_DELETE)[:15]
         self.data = {
             "company": {},
-            "ledgers": [],
             "stock_groups": [],
-            "stock_items": [],
-            "vouchers": [],
             "godowns": [],
             "cost_centers": [],
             "units": [],
             "currencies": [],
-            "summary": {}
+            "summary": {},
+            "files": {}
         }
         
+        # NDJSON writers for the streamed sections, opened by generate_all
+        self.output_dir = None
+        self.file_stem = None
+        self._writers = {}
+        
+        # Bulk masters draw their random fields as whole NumPy columns
+        self.rng = _NPRNG
+        
         # Counters for unique IDs
         self.ledger_counter = 0
         self.voucher_counter = 0
@@ -149,6 +557,7 @@ class TallyDataGenerator:
         self.customer_ledgers = []
         self.supplier_ledgers = []
         self.stock_item_names = []
+        self.godown_names = ("Main Warehouse",)
         self.expense_ledgers = []
         self.income_ledgers = []
         
@@ -158,12 +567,15 @@ class TallyDataGenerator:
         self.total_receipts = 0
         self.total_payments = 0
         
-        # Monthly tracking for charts
-        self.monthly_sales = {i: 0 for i in range(1, 13)}
-        self.monthly_purchases = {i: 0 for i in range(1, 13)}
+        # Monthly tracking for charts, indexed by summary month (slot 0 unused)
+        self.monthly_sales = np.zeros(13)
+        self.monthly_purchases = np.zeros(13)
+        
+        # Closing balances per ledger group, for the balance sheet summary
+        self.group_balances = {}
         
-    def generate_all(self, target_entries=500000):
-        """Generate all Tally data"""
+    def generate_all(self, target_entries=500000, output_dir=None):
+        """Generate all Tally data, streaming ledgers, stock items and vouchers to disk"""
         print(f"🏢 Generating Tally data for: {self.company_name}")
         print(f"📊 Target entries: {target_entries:,}")
         print("=" * 60)
@@ -185,6 +597,24 @@ class TallyDataGenerator:
         print(f"   Income Ledgers: {num_income_ledgers:,}")
         print(f"   Vouchers: {num_vouchers:,}")
         
+        self._open_writers(output_dir or OUTPUT_DIR)
+        try:
+            self._generate_sections(num_customers, num_suppliers, num_stock_items,
+                                    num_expense_ledgers, num_income_ledgers, num_vouchers)
+        finally:
+            self._close_writers()
+        
+        print("\n✅ Data generation complete!")
+        print(f"   Total Ledgers: {self.ledger_counter:,}")
+        print(f"   Total Stock Items: {self.stock_counter:,}")
+        print(f"   Total Vouchers: {self.voucher_counter:,}")
+        print(f"   Total Entries: {self.ledger_counter + self.stock_counter + self.voucher_counter:,}")
+        
+        return self.data
+    
+    def _generate_sections(self, num_customers, num_suppliers, num_stock_items,
+                           num_expense_ledgers, num_income_ledgers, num_vouchers):
+        """Generate every master and voucher section in dependency order"""
         # 1. Generate Company
         print("\n1️⃣ Generating Company...")
         self._generate_company()
@@ -236,39 +666,54 @@ class TallyDataGenerator:
         # 13. Generate Summary
         print("1️⃣3️⃣ Generating Summary...")
         self._generate_summary()
-        
-        print("\n✅ Data generation complete!")
-        print(f"   Total Ledgers: {len(self.data['ledgers']):,}")
-        print(f"   Total Stock Items: {len(self.data['stock_items']):,}")
-        print(f"   Total Vouchers: {len(self.data['vouchers']):,}")
-        print(f"   Total Entries: {len(self.data['ledgers']) + len(self.data['stock_items']) + len(self.data['vouchers']):,}")
-        
-        return self.data
+    
+    def _open_writers(self, output_dir):
+        """Open one NDJSON writer per streamed section"""
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.file_stem = f"tally_backup_{self.company_name.replace(' ', '_')[:30]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        
+        for section in STREAMED_SECTIONS:
+            filename = f"{self.file_stem}_{section}.ndjson"
+            self.data["files"][section] = filename
+            self._writers[section] = NDJSONWriter(os.path.join(output_dir, filename))
+    
+    def _close_writers(self):
+        """Flush and close the NDJSON section files"""
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+    
+    def _write_ledger(self, ledger):
+        """Stream one ledger and roll its closing balance into its group total"""
+        self._writers["ledgers"].write(_json_line(ledger))
+        parent = ledger["parent"]
+        self.group_balances[parent] = self.group_balances.get(parent, 0) + ledger["closing_balance"]
     
     def _generate_company(self):
         """Generate company master"""
-        state = random.choice(list(GST_STATES.keys()))
+        state = _STATE_NAMES[_RNG.randrange(len(_STATE_NAMES))]
         state_code = GST_STATES[state]
         
         self.data["company"] = {
             "name": self.company_name,
             "formal_name": self.company_name,
-            "address": f"Plot No. {random.randint(1, 500)}, Industrial Area, Phase-{random.choice(['I', 'II', 'III'])}",
-            "city": random.choice(CITIES),
+            "address": f"Plot No. {_RNG.randint(1, 500)}, Industrial Area, Phase-{_RNG.choice(['I', 'II', 'III'])}",
+            "city": _RNG.choice(CITIES),
             "state": state,
-            "pincode": str(random.randint(100000, 999999)),
+            "pincode": str(_RNG.randint(100000, 999999)),
             "country": "India",
-            "phone": f"+91-{random.randint(20, 99)}-{random.randint(10000000, 99999999)}",
-            "email": f"accounts@{self.company_name.lower().replace(' ', '').replace('&', '')[:15]}.com",
-            "website": f"www.{self.company_name.lower().replace(' ', '').replace('&', '')[:15]}.com",
+            "phone": f"+91-{_RNG.randint(20, 99)}-{_RNG.randint(10000000, 99999999)}",
+            "email": f"accounts@{self._slug}.com",
+            "website": f"www.{self._slug}.com",
             "pan": generate_pan(),
             "gstin": generate_gstin(state_code),
-            "cin": f"U{random.randint(10000, 99999)}{state_code}2020PTC{random.randint(100000, 999999)}",
+            "cin": f"U{_RNG.randint(10000, 99999)}{state_code}2020PTC{_RNG.randint(100000, 999999)}",
             "books_from": format_date(FINANCIAL_YEAR_START),
             "financial_year_from": "01-Apr-2024",
             "financial_year_to": "31-Mar-2025",
             "currency": "INR",
-            "guid": f"company-{random.randint(100000, 999999)}"
+            "guid": f"company-{_RNG.randint(100000, 999999)}"
         }
     
     def _generate_units(self):
@@ -292,10 +737,11 @@ class TallyDataGenerator:
         for name in godowns:
             self.data["godowns"].append({
                 "name": name,
-                "address": f"Location {random.randint(1, 100)}",
+                "address": f"Location {_RNG.randint(1, 100)}",
                 "is_internal": True,
                 "has_no_space": False
             })
+        self.godown_names = tuple(g["name"] for g in self.data["godowns"]) or ("Main Warehouse",)
     
     def _generate_cost_centers(self):
         """Generate cost center masters"""
@@ -332,52 +778,61 @@ class TallyDataGenerator:
     def _generate_stock_items(self, count):
         """Generate stock item masters"""
         items_per_category = count // len(PRODUCT_CATEGORIES)
+        n = items_per_category * len(PRODUCT_CATEGORIES)
+        rng = self.rng
+        first_id = self.stock_counter + 1
+        ids = range(first_id, first_id + n)
+        
+        # Every field is built as a whole column; numeric columns that go
+        # straight into the output stay NumPy arrays, which orjson
+        # serializes natively
+        godown_names = np.array(self.godown_names, dtype=object)
         
+        names = []
         for category in PRODUCT_CATEGORIES:
-            for i in range(items_per_category):
-                self.stock_counter += 1
-                
-                name = f"{generate_product_name(category)} {self.stock_counter}"
-                unit = random.choice(UNITS)
-                gst_rate = random.choice(GST_RATES)
-                
-                # Realistic pricing
-                cost_price = round_amount(random.uniform(50, 50000))
-                margin = random.uniform(0.05, 0.40)  # 5% to 40% margin
-                selling_price = round_amount(cost_price * (1 + margin))
-                
-                opening_qty = random.randint(0, 1000)
-                opening_value = round_amount(opening_qty * cost_price)
-                
-                item = {
-                    "name": name,
-                    "guid": f"stock-{self.stock_counter}",
-                    "parent": category,
-                    "category": f"{category} - Finished Goods",
-                    "base_units": unit,
-                    "opening_balance": opening_qty,
-                    "opening_value": opening_value,
-                    "closing_balance": opening_qty,
-                    "closing_value": opening_value,
-                    "gst_applicable": True,
-                    "gst_rate": gst_rate,
-                    "hsn_code": f"{random.randint(1000, 9999)}{random.randint(10, 99)}",
-                    "cost_price": cost_price,
-                    "selling_price": selling_price,
-                    "mrp": round_amount(selling_price * 1.1),
-                    "godown": random.choice(self.data["godowns"])["name"] if self.data["godowns"] else "Main Warehouse",
-                    "batch_name": f"BATCH-{random.randint(1000, 9999)}",
-                    "mfg_date": format_date(random_date(datetime(2024, 1, 1), FINANCIAL_YEAR_START)),
-                    "expiry_date": format_date(random_date(FINANCIAL_YEAR_END, datetime(2026, 3, 31))),
-                    "reorder_level": random.randint(10, 100),
-                    "minimum_order_qty": random.randint(1, 10)
-                }
-                
-                self.data["stock_items"].append(item)
-                self.stock_item_names.append(name)
-                
-                if self.stock_counter % 1000 == 0:
-                    print(f"   Generated {self.stock_counter:,} stock items...")
+            names += generate_product_names(category, items_per_category, rng)
+        names = [f"{name} {item_id}" for name, item_id in zip(names, ids)]
+        parents = np.repeat(_PRODUCT_CATEGORIES_ARR, items_per_category)
+        
+        # Realistic pricing
+        cost_prices = rng.uniform(50, 50000, n).round(2)
+        margins = rng.uniform(0.05, 0.40, n)  # 5% to 40% margin
+        selling_prices = (cost_prices * (1 + margins)).round(2)
+        opening_qtys = rng.integers(0, 1001, n)
+        opening_values = (opening_qtys * cost_prices).round(2)
+        
+        items = StockItemColumns(
+            name=names,
+            guid=[f"stock-{item_id}" for item_id in ids],
+            parent=parents,
+            category=parents + " - Finished Goods",
+            base_units=_UNITS_ARR[rng.integers(0, len(UNITS), n)],
+            opening_balance=opening_qtys,
+            opening_value=opening_values,
+            closing_balance=opening_qtys,
+            closing_value=opening_values,
+            gst_applicable=[True] * n,
+            gst_rate=rng.choice(GST_RATES, n),
+            hsn_code=(rng.integers(1000, 10000, n) * 100 + rng.integers(10, 100, n)).astype(str),
+            cost_price=cost_prices,
+            selling_price=selling_prices,
+            mrp=(selling_prices * 1.1).round(2),
+            godown=godown_names[rng.integers(0, len(godown_names), n)],
+            batch_name="BATCH-" + rng.integers(1000, 10000, n).astype(str).astype(object),
+            mfg_date=MFG_DATES[rng.integers(0, len(MFG_DATES), n)],
+            expiry_date=EXPIRY_DATES[rng.integers(0, len(EXPIRY_DATES), n)],
+            reorder_level=rng.integers(10, 101, n),
+            minimum_order_qty=rng.integers(1, 11, n),
+        )
+        
+        write = self._writers["stock_items"].write
+        for line in map(_json_line, items.rows()):
+            write(line)
+        self.stock_counter += n
+        _progress(self.stock_counter, "stock items", "\n")
+        
+        # Only the names are needed later; the other columns are freed here
+        self.stock_item_names = items.name
     
     def _generate_base_ledgers(self):
         """Generate base ledgers (Bank, Cash, Tax accounts, etc.)"""
@@ -480,56 +935,33 @@ class TallyDataGenerator:
             self.ledger_counter += 1
             ledger["guid"] = f"ledger-{self.ledger_counter}"
             ledger["closing_balance"] = ledger.get("opening_balance", 0)
-            self.data["ledgers"].append(ledger)
+            self._write_ledger(ledger)
     
     def _generate_party_ledgers(self, parent, count, is_customer=True):
-        """Generate customer or supplier ledgers"""
-        prefix = "D" if is_customer else "C"
-        
-        for i in range(count):
-            self.ledger_counter += 1
-            
-            state = random.choice(list(GST_STATES.keys()))
-            state_code = GST_STATES[state]
-            
-            # Random opening balance
-            if is_customer:
-                opening = round_amount(random.uniform(0, 500000))  # Debit balance for debtors
-            else:
-                opening = -round_amount(random.uniform(0, 500000))  # Credit balance for creditors
-            
-            name = f"{generate_company_name()} {prefix}{self.ledger_counter}"
-            
-            ledger = {
-                "name": name,
-                "guid": f"ledger-{self.ledger_counter}",
-                "parent": parent,
-                "address": f"Address Line {random.randint(1, 999)}, {random.choice(CITIES)}",
-                "state": state,
-                "country": "India",
-                "pincode": str(random.randint(100000, 999999)),
-                "gstin": generate_gstin(state_code) if random.random() > 0.2 else "",  # 80% have GSTIN
-                "pan": generate_pan(),
-                "email": f"contact{self.ledger_counter}@example.com",
-                "phone": f"+91-{random.randint(7000000000, 9999999999)}",
-                "opening_balance": opening,
-                "closing_balance": opening,
-                "credit_limit": round_amount(random.uniform(100000, 5000000)) if is_customer else 0,
-                "credit_days": random.choice([15, 30, 45, 60, 90]),
-                "is_gst_registered": random.random() > 0.2,
-                "gst_registration_type": random.choice(["Regular", "Composition", "Unregistered"]),
-                "maintain_bill_by_bill": True
-            }
-            
-            self.data["ledgers"].append(ledger)
-            
-            if is_customer:
-                self.customer_ledgers.append(name)
-            else:
-                self.supplier_ledgers.append(name)
-            
-            if self.ledger_counter % 5000 == 0:
-                print(f"   Generated {self.ledger_counter:,} ledgers...")
+        """Generate customer or supplier ledgers in ID-range shards spread over the CPUs"""
+        if count <= 0:
+            return
+        
+        # Shards and their seeds depend only on count, so a seeded run
+        # writes the same ledgers whatever the CPU count
+        starts = range(0, count, PARTY_SHARD_SIZE)
+        seeds = self.rng.integers(0, 2**63, len(starts)).tolist()
+        shards = [
+            (self.ledger_counter + 1 + start, min(PARTY_SHARD_SIZE, count - start), parent, is_customer, seed)
+            for start, seed in zip(starts, seeds)
+        ]
+        num_proc = max(1, min(os.cpu_count() or 1, len(shards)))
+        names = self.customer_ledgers if is_customer else self.supplier_ledgers
+        
+        # imap (not imap_unordered) keeps the ledger file in ID order
+        with multiprocessing.Pool(num_proc) as pool:
+            for buffer, shard_names, closing_total in pool.imap(_gen_party_shard, shards):
+                self._writers["ledgers"].write(buffer)
+                names.extend(shard_names)
+                self.ledger_counter += len(shard_names)
+                self.group_balances[parent] = self.group_balances.get(parent, 0) + closing_total
+                _progress(self.ledger_counter, "ledgers")
+        _progress(self.ledger_counter, "ledgers", "\n")
     
     def _generate_expense_ledgers(self, count):
         """Generate expense ledgers"""
@@ -564,11 +996,15 @@ class TallyDataGenerator:
             ("Job Work Charges", "Direct Expenses"),
         ]
         
+        types = self.rng.integers(0, len(expense_types), count).tolist()
+        by_city = (self.rng.random(count) > 0.5).tolist()
+        cities = _CITIES_ARR[self.rng.integers(0, len(CITIES), count)].tolist()
+        
         for i in range(count):
             self.ledger_counter += 1
-            exp_type, parent = random.choice(expense_types)
+            exp_type, parent = expense_types[types[i]]
             
-            name = f"{exp_type} - {random.choice(CITIES)}" if random.random() > 0.5 else f"{exp_type} {self.ledger_counter}"
+            name = f"{exp_type} - {cities[i]}" if by_city[i] else f"{exp_type} {self.ledger_counter}"
             
             ledger = {
                 "name": name,
@@ -579,7 +1015,7 @@ class TallyDataGenerator:
                 "is_expense": True
             }
             
-            self.data["ledgers"].append(ledger)
+            self._write_ledger(ledger)
             self.expense_ledgers.append(name)
     
     def _generate_income_ledgers(self, count):
@@ -598,9 +1034,11 @@ class TallyDataGenerator:
             ("Scrap Sales", "Direct Incomes"),
         ]
         
+        types = self.rng.integers(0, len(income_types), count).tolist()
+        
         for i in range(count):
             self.ledger_counter += 1
-            inc_type, parent = random.choice(income_types)
+            inc_type, parent = income_types[types[i]]
             
             name = f"{inc_type} {self.ledger_counter}"
             
@@ -613,258 +1051,262 @@ class TallyDataGenerator:
                 "is_revenue": True
             }
             
-            self.data["ledgers"].append(ledger)
+            self._write_ledger(ledger)
             self.income_ledgers.append(name)
     
     def _generate_vouchers(self, count):
-        """Generate vouchers of all types"""
-        # Voucher type distribution
-        voucher_types = {
-            "Sales": 0.30,
-            "Purchase": 0.25,
-            "Receipt": 0.15,
-            "Payment": 0.15,
-            "Journal": 0.08,
-            "Contra": 0.02,
-            "Credit Note": 0.025,
-            "Debit Note": 0.025
-        }
-        
-        for voucher_type, ratio in voucher_types.items():
+        """Generate vouchers of all types, in number-range shards spread over the CPUs"""
+        shards = []
+        first = self.voucher_counter + 1
+        for voucher_type, (ratio, low, high, with_gst) in VOUCHER_TYPES.items():
             type_count = int(count * ratio)
             print(f"   Generating {type_count:,} {voucher_type} vouchers...")
-            
-            for i in range(type_count):
-                self.voucher_counter += 1
-                voucher_date = random_date()
-                month_num = voucher_date.month if voucher_date.month >= 4 else voucher_date.month + 9
-                if month_num > 12:
-                    month_num -= 12
+            for start in range(0, type_count, VOUCHER_SHARD_SIZE):
+                size = min(VOUCHER_SHARD_SIZE, type_count - start)
+                shards.append((voucher_type, first, size))
+                first += size
+        seeds = self.rng.integers(0, 2**63, len(shards)).tolist()
+        num_proc = max(1, min(os.cpu_count() or 1, len(shards)))
+        
+        # The read-only name lists go to each worker once, not with every shard
+        name_lists = (self.customer_ledgers, self.supplier_ledgers, self.expense_ledgers,
+                      self.stock_item_names, self.godown_names)
+        write = self._writers["vouchers"].write
+        
+        tasks = [shard + (seed,) for shard, seed in zip(shards, seeds)]
+        
+        # imap (not imap_unordered) keeps the voucher file in number order;
+        # with a single CPU the shards are built in-process, skipping the
+        # round trip of every buffer through a worker pipe
+        with contextlib.ExitStack() as stack:
+            if num_proc > 1:
+                pool = stack.enter_context(multiprocessing.Pool(num_proc, _init_voucher_worker, (name_lists,)))
+                results = pool.imap(_gen_voucher_shard, tasks)
+            else:
+                _init_voucher_worker(name_lists)
+                results = map(_gen_voucher_shard, tasks)
+            for (voucher_type, _, size), (buffer, total, monthly) in zip(shards, results):
+                write(buffer)
+                self.voucher_counter += size
                 
+                # Running totals and the monthly summary slots
                 if voucher_type == "Sales":
-                    voucher = self._create_sales_voucher(voucher_date)
-                    self.total_sales += voucher.get("amount", 0)
-                    self.monthly_sales[month_num] = self.monthly_sales.get(month_num, 0) + voucher.get("amount", 0)
+                    self.total_sales += total
+                    self.monthly_sales += monthly
                 elif voucher_type == "Purchase":
-                    voucher = self._create_purchase_voucher(voucher_date)
-                    self.total_purchases += voucher.get("amount", 0)
-                    self.monthly_purchases[month_num] = self.monthly_purchases.get(month_num, 0) + voucher.get("amount", 0)
+                    self.total_purchases += total
+                    self.monthly_purchases += monthly
                 elif voucher_type == "Receipt":
-                    voucher = self._create_receipt_voucher(voucher_date)
-                    self.total_receipts += voucher.get("amount", 0)
+                    self.total_receipts += total
                 elif voucher_type == "Payment":
-                    voucher = self._create_payment_voucher(voucher_date)
-                    self.total_payments += voucher.get("amount", 0)
-                elif voucher_type == "Journal":
-                    voucher = self._create_journal_voucher(voucher_date)
-                elif voucher_type == "Contra":
-                    voucher = self._create_contra_voucher(voucher_date)
-                elif voucher_type == "Credit Note":
-                    voucher = self._create_credit_note(voucher_date)
-                elif voucher_type == "Debit Note":
-                    voucher = self._create_debit_note(voucher_date)
-                else:
-                    continue
-                
-                self.data["vouchers"].append(voucher)
+                    self.total_payments += total
                 
-                if self.voucher_counter % 10000 == 0:
-                    print(f"      Generated {self.voucher_counter:,} vouchers...")
+                _progress(self.voucher_counter, "vouchers")
+        _progress(self.voucher_counter, "vouchers", "\n")
+    
+    def _batch_inventory_entries(self, base_amounts, num_items):
+        """Pick stock items for a batch of invoices and split each base amount over them"""
+        n = len(num_items)
+        names = self.stock_item_names
+        if not names:
+            return [[] for _ in range(n)]
+        
+        rng = self.rng
+        counts = np.minimum(num_items, len(names))
+        items = draw_distinct_indices(len(names), counts, rng).tolist()
+        width = MAX_INVOICE_ITEMS
+        qtys = rng.integers(1, 101, (n, width)).tolist()
+        godowns = np.array(self.godown_names, dtype=object)[rng.integers(0, len(self.godown_names), (n, width))].tolist()
+        
+        batch = []
+        for base_amount, drawn, count, row_items, row_qtys, row_godowns in zip(
+                base_amounts, num_items.tolist(), counts.tolist(), items, qtys, godowns):
+            inventory_entries = []
+            for item, qty, godown in zip(row_items[:count], row_qtys, row_godowns):
+                rate = round_amount(base_amount / (drawn * qty))
+                inventory_entries.append({
+                    "stock_item": names[item],
+                    "quantity": qty,
+                    "rate": rate,
+                    "amount": round_amount(qty * rate),
+                    "godown": godown
+                })
+            batch.append(inventory_entries)
+        return batch
     
-    def _create_sales_voucher(self, date):
-        """Create a sales voucher with GST"""
-        customer = random.choice(self.customer_ledgers) if self.customer_ledgers else "Cash Sales"
-        
-        # Select random stock items
-        num_items = random.randint(1, 5)
-        items = random.sample(self.stock_item_names, min(num_items, len(self.stock_item_names))) if self.stock_item_names else []
-        
-        base_amount = round_amount(random.uniform(1000, 500000))
-        gst_rate = random.choice(GST_RATES)
-        gst_amount = round_amount(base_amount * gst_rate / 100)
-        total_amount = round_amount(base_amount + gst_amount)
-        
-        # Determine if local or interstate
-        is_local = random.random() > 0.3
-        
-        inventory_entries = []
-        for item in items:
-            qty = random.randint(1, 100)
-            rate = round_amount(base_amount / (num_items * qty)) if num_items > 0 else base_amount
-            inventory_entries.append({
-                "stock_item": item,
-                "quantity": qty,
-                "rate": rate,
-                "amount": round_amount(qty * rate),
-                "godown": random.choice(self.data["godowns"])["name"] if self.data["godowns"] else "Main Warehouse"
+    def _batch_create_sales(self, numbers, days, amounts):
+        """Create a batch of sales vouchers with GST"""
+        n = len(numbers)
+        customers = pick_names(self.customer_ledgers, n, self.rng, "Cash Sales")
+        num_items = self.rng.integers(1, MAX_INVOICE_ITEMS + 1, n)
+        inventory = self._batch_inventory_entries([row[0] for row in amounts], num_items)
+        
+        vouchers = []
+        for number, day, customer, inventory_entries, (base_amount, gst_rate, gst_amount, half_gst, total_amount, is_local) in zip(
+                numbers, days, customers, inventory, amounts):
+            ledger_entries = [
+                {"ledger": customer, "amount": total_amount, "is_debit": True},
+                {"ledger": "Sales - Local" if is_local else "Sales - Interstate", "amount": base_amount, "is_debit": False},
+            ]
+            
+            if gst_rate > 0:
+                if is_local:
+                    ledger_entries.append({"ledger": f"CGST Output {gst_rate}%", "amount": half_gst, "is_debit": False})
+                    ledger_entries.append({"ledger": f"SGST Output {gst_rate}%", "amount": half_gst, "is_debit": False})
+                else:
+                    ledger_entries.append({"ledger": f"IGST Output {gst_rate}%", "amount": gst_amount, "is_debit": False})
+            
+            vouchers.append({
+                "voucher_number": f"SAL/{VOUCHER_PERIODS[day]}/{number}",
+                "guid": f"voucher-{number}",
+                "date": TALLY_DATES[day],
+                "display_date": DISPLAY_DATES[day],
+                "type": "Sales",
+                "voucher_type": "Sales",
+                "party_name": customer,
+                "amount": total_amount,
+                "base_amount": base_amount,
+                "gst_rate": gst_rate,
+                "gst_amount": gst_amount,
+                "is_local": is_local,
+                "narration": f"Sales to {customer} - Invoice {number}",
+                "ledger_entries": ledger_entries,
+                "inventory_entries": inventory_entries,
+                "is_invoice": True,
+                "reference_number": f"INV-{number}",
+                "reference_date": TALLY_DATES[day]
             })
-        
-        ledger_entries = [
-            {"ledger": customer, "amount": total_amount, "is_debit": True},
-            {"ledger": "Sales - Local" if is_local else "Sales - Interstate", "amount": base_amount, "is_debit": False},
-        ]
-        
-        if gst_rate > 0:
-            if is_local:
-                ledger_entries.append({"ledger": f"CGST Output {gst_rate}%", "amount": round_amount(gst_amount / 2), "is_debit": False})
-                ledger_entries.append({"ledger": f"SGST Output {gst_rate}%", "amount": round_amount(gst_amount / 2), "is_debit": False})
-            else:
-                ledger_entries.append({"ledger": f"IGST Output {gst_rate}%", "amount": gst_amount, "is_debit": False})
-        
-        return {
-            "voucher_number": f"SAL/{date.strftime('%y%m')}/{self.voucher_counter}",
-            "guid": f"voucher-{self.voucher_counter}",
-            "date": format_date(date),
-            "display_date": format_display_date(date),
-            "type": "Sales",
-            "voucher_type": "Sales",
-            "party_name": customer,
-            "amount": total_amount,
-            "base_amount": base_amount,
-            "gst_rate": gst_rate,
-            "gst_amount": gst_amount,
-            "is_local": is_local,
-            "narration": f"Sales to {customer} - Invoice {self.voucher_counter}",
-            "ledger_entries": ledger_entries,
-            "inventory_entries": inventory_entries,
-            "is_invoice": True,
-            "reference_number": f"INV-{self.voucher_counter}",
-            "reference_date": format_date(date)
-        }
+        return vouchers
     
-    def _create_purchase_voucher(self, date):
-        """Create a purchase voucher with GST"""
-        supplier = random.choice(self.supplier_ledgers) if self.supplier_ledgers else "Cash Purchase"
-        
-        # Select random stock items
-        num_items = random.randint(1, 5)
-        items = random.sample(self.stock_item_names, min(num_items, len(self.stock_item_names))) if self.stock_item_names else []
-        
-        base_amount = round_amount(random.uniform(1000, 400000))
-        gst_rate = random.choice(GST_RATES)
-        gst_amount = round_amount(base_amount * gst_rate / 100)
-        total_amount = round_amount(base_amount + gst_amount)
-        
-        is_local = random.random() > 0.3
-        
-        inventory_entries = []
-        for item in items:
-            qty = random.randint(1, 100)
-            rate = round_amount(base_amount / (num_items * qty)) if num_items > 0 else base_amount
-            inventory_entries.append({
-                "stock_item": item,
-                "quantity": qty,
-                "rate": rate,
-                "amount": round_amount(qty * rate),
-                "godown": random.choice(self.data["godowns"])["name"] if self.data["godowns"] else "Main Warehouse"
+    def _batch_create_purchases(self, numbers, days, amounts):
+        """Create a batch of purchase vouchers with GST"""
+        n = len(numbers)
+        rng = self.rng
+        suppliers = pick_names(self.supplier_ledgers, n, rng, "Cash Purchase")
+        num_items = rng.integers(1, MAX_INVOICE_ITEMS + 1, n)
+        inventory = self._batch_inventory_entries([row[0] for row in amounts], num_items)
+        invoice_nos = rng.integers(10000, 100000, n).tolist()
+        # The supplier's invoice is dated up to SUPPLIER_INVOICE_LEAD_DAYS before the bill
+        invoice_dates = SUPPLIER_INVOICE_DATES[
+            np.asarray(days) + SUPPLIER_INVOICE_LEAD_DAYS - rng.integers(0, SUPPLIER_INVOICE_LEAD_DAYS + 1, n)
+        ].tolist()
+        
+        vouchers = []
+        for number, day, supplier, inventory_entries, invoice_no, invoice_date, (base_amount, gst_rate, gst_amount, half_gst, total_amount, is_local) in zip(
+                numbers, days, suppliers, inventory, invoice_nos, invoice_dates, amounts):
+            ledger_entries = [
+                {"ledger": supplier, "amount": total_amount, "is_debit": False},
+                {"ledger": "Purchase - Local" if is_local else "Purchase - Interstate", "amount": base_amount, "is_debit": True},
+            ]
+            
+            if gst_rate > 0:
+                if is_local:
+                    ledger_entries.append({"ledger": f"CGST Input {gst_rate}%", "amount": half_gst, "is_debit": True})
+                    ledger_entries.append({"ledger": f"SGST Input {gst_rate}%", "amount": half_gst, "is_debit": True})
+                else:
+                    ledger_entries.append({"ledger": f"IGST Input {gst_rate}%", "amount": gst_amount, "is_debit": True})
+            
+            vouchers.append({
+                "voucher_number": f"PUR/{VOUCHER_PERIODS[day]}/{number}",
+                "guid": f"voucher-{number}",
+                "date": TALLY_DATES[day],
+                "display_date": DISPLAY_DATES[day],
+                "type": "Purchase",
+                "voucher_type": "Purchase",
+                "party_name": supplier,
+                "amount": total_amount,
+                "base_amount": base_amount,
+                "gst_rate": gst_rate,
+                "gst_amount": gst_amount,
+                "is_local": is_local,
+                "narration": f"Purchase from {supplier} - Bill {number}",
+                "ledger_entries": ledger_entries,
+                "inventory_entries": inventory_entries,
+                "is_invoice": True,
+                "supplier_invoice_no": f"SUP-{invoice_no}",
+                "supplier_invoice_date": invoice_date
             })
-        
-        ledger_entries = [
-            {"ledger": supplier, "amount": total_amount, "is_debit": False},
-            {"ledger": "Purchase - Local" if is_local else "Purchase - Interstate", "amount": base_amount, "is_debit": True},
-        ]
-        
-        if gst_rate > 0:
-            if is_local:
-                ledger_entries.append({"ledger": f"CGST Input {gst_rate}%", "amount": round_amount(gst_amount / 2), "is_debit": True})
-                ledger_entries.append({"ledger": f"SGST Input {gst_rate}%", "amount": round_amount(gst_amount / 2), "is_debit": True})
-            else:
-                ledger_entries.append({"ledger": f"IGST Input {gst_rate}%", "amount": gst_amount, "is_debit": True})
-        
-        return {
-            "voucher_number": f"PUR/{date.strftime('%y%m')}/{self.voucher_counter}",
-            "guid": f"voucher-{self.voucher_counter}",
-            "date": format_date(date),
-            "display_date": format_display_date(date),
-            "type": "Purchase",
-            "voucher_type": "Purchase",
-            "party_name": supplier,
-            "amount": total_amount,
-            "base_amount": base_amount,
-            "gst_rate": gst_rate,
-            "gst_amount": gst_amount,
-            "is_local": is_local,
-            "narration": f"Purchase from {supplier} - Bill {self.voucher_counter}",
-            "ledger_entries": ledger_entries,
-            "inventory_entries": inventory_entries,
-            "is_invoice": True,
-            "supplier_invoice_no": f"SUP-{random.randint(10000, 99999)}",
-            "supplier_invoice_date": format_date(date - timedelta(days=random.randint(0, 5)))
-        }
+        return vouchers
     
-    def _create_receipt_voucher(self, date):
-        """Create a receipt voucher"""
-        customer = random.choice(self.customer_ledgers) if self.customer_ledgers else "Cash"
-        amount = round_amount(random.uniform(5000, 1000000))
-        
+    def _batch_create_receipts(self, numbers, days, amounts):
+        """Create a batch of receipt vouchers"""
+        n = len(numbers)
+        rng = self.rng
+        customers = pick_names(self.customer_ledgers, n, rng, "Cash")
         # Payment mode
-        mode = random.choice(["Cash", "Cheque", "NEFT", "RTGS", "UPI"])
-        bank = random.choice(["HDFC Bank Current A/c", "ICICI Bank Current A/c", "State Bank of India"])
-        
-        credit_ledger = "Cash in Hand" if mode == "Cash" else bank
-        
-        return {
-            "voucher_number": f"REC/{date.strftime('%y%m')}/{self.voucher_counter}",
-            "guid": f"voucher-{self.voucher_counter}",
-            "date": format_date(date),
-            "display_date": format_display_date(date),
-            "type": "Receipt",
-            "voucher_type": "Receipt",
-            "party_name": customer,
-            "amount": amount,
-            "payment_mode": mode,
-            "narration": f"Receipt from {customer} via {mode}",
-            "ledger_entries": [
-                {"ledger": credit_ledger, "amount": amount, "is_debit": True},
-                {"ledger": customer, "amount": amount, "is_debit": False}
-            ],
-            "cheque_number": f"{random.randint(100000, 999999)}" if mode == "Cheque" else "",
-            "cheque_date": format_date(date) if mode == "Cheque" else "",
-            "bank_name": bank if mode != "Cash" else ""
-        }
+        modes = pick_names(PAYMENT_MODES, n, rng, None)
+        banks = pick_names(PAYMENT_BANKS, n, rng, None)
+        cheque_numbers = rng.integers(100000, 1000000, n).tolist()
+        
+        vouchers = []
+        for number, day, customer, mode, bank, cheque_number, (amount,) in zip(
+                numbers, days, customers, modes, banks, cheque_numbers, amounts):
+            credit_ledger = "Cash in Hand" if mode == "Cash" else bank
+            
+            vouchers.append({
+                "voucher_number": f"REC/{VOUCHER_PERIODS[day]}/{number}",
+                "guid": f"voucher-{number}",
+                "date": TALLY_DATES[day],
+                "display_date": DISPLAY_DATES[day],
+                "type": "Receipt",
+                "voucher_type": "Receipt",
+                "party_name": customer,
+                "amount": amount,
+                "payment_mode": mode,
+                "narration": f"Receipt from {customer} via {mode}",
+                "ledger_entries": [
+                    {"ledger": credit_ledger, "amount": amount, "is_debit": True},
+                    {"ledger": customer, "amount": amount, "is_debit": False}
+                ],
+                "cheque_number": f"{cheque_number}" if mode == "Cheque" else "",
+                "cheque_date": TALLY_DATES[day] if mode == "Cheque" else "",
+                "bank_name": bank if mode != "Cash" else ""
+            })
+        return vouchers
     
-    def _create_payment_voucher(self, date):
-        """Create a payment voucher"""
+    def _batch_create_payments(self, numbers, days, amounts):
+        """Create a batch of payment vouchers"""
+        n = len(numbers)
+        rng = self.rng
         # 70% to suppliers, 30% to expenses
-        if random.random() > 0.3 and self.supplier_ledgers:
-            party = random.choice(self.supplier_ledgers)
-            is_expense = False
-        else:
-            party = random.choice(self.expense_ledgers) if self.expense_ledgers else "Miscellaneous Expenses"
-            is_expense = True
-        
-        amount = round_amount(random.uniform(1000, 500000))
-        
-        mode = random.choice(["Cash", "Cheque", "NEFT", "RTGS", "UPI"])
-        bank = random.choice(["HDFC Bank Current A/c", "ICICI Bank Current A/c", "State Bank of India"])
-        
-        debit_ledger = "Cash in Hand" if mode == "Cash" else bank
-        
-        return {
-            "voucher_number": f"PAY/{date.strftime('%y%m')}/{self.voucher_counter}",
-            "guid": f"voucher-{self.voucher_counter}",
-            "date": format_date(date),
-            "display_date": format_display_date(date),
-            "type": "Payment",
-            "voucher_type": "Payment",
-            "party_name": party,
-            "amount": amount,
-            "payment_mode": mode,
-            "is_expense": is_expense,
-            "narration": f"Payment to {party} via {mode}",
-            "ledger_entries": [
-                {"ledger": party, "amount": amount, "is_debit": True},
-                {"ledger": debit_ledger, "amount": amount, "is_debit": False}
-            ],
-            "cheque_number": f"{random.randint(100000, 999999)}" if mode == "Cheque" else "",
-            "cheque_date": format_date(date) if mode == "Cheque" else "",
-            "bank_name": bank if mode != "Cash" else ""
-        }
+        is_expense = ((rng.random(n) <= 0.3) | (not self.supplier_ledgers)).tolist()
+        suppliers = pick_names(self.supplier_ledgers, n, rng, "")
+        expenses = pick_names(self.expense_ledgers, n, rng, "Miscellaneous Expenses")
+        modes = pick_names(PAYMENT_MODES, n, rng, None)
+        banks = pick_names(PAYMENT_BANKS, n, rng, None)
+        cheque_numbers = rng.integers(100000, 1000000, n).tolist()
+        
+        vouchers = []
+        for number, day, to_expense, supplier, expense, mode, bank, cheque_number, (amount,) in zip(
+                numbers, days, is_expense, suppliers, expenses, modes, banks, cheque_numbers, amounts):
+            party = expense if to_expense else supplier
+            
+            debit_ledger = "Cash in Hand" if mode == "Cash" else bank
+            
+            vouchers.append({
+                "voucher_number": f"PAY/{VOUCHER_PERIODS[day]}/{number}",
+                "guid": f"voucher-{number}",
+                "date": TALLY_DATES[day],
+                "display_date": DISPLAY_DATES[day],
+                "type": "Payment",
+                "voucher_type": "Payment",
+                "party_name": party,
+                "amount": amount,
+                "payment_mode": mode,
+                "is_expense": to_expense,
+                "narration": f"Payment to {party} via {mode}",
+                "ledger_entries": [
+                    {"ledger": party, "amount": amount, "is_debit": True},
+                    {"ledger": debit_ledger, "amount": amount, "is_debit": False}
+                ],
+                "cheque_number": f"{cheque_number}" if mode == "Cheque" else "",
+                "cheque_date": TALLY_DATES[day] if mode == "Cheque" else "",
+                "bank_name": bank if mode != "Cash" else ""
+            })
+        return vouchers
     
-    def _create_journal_voucher(self, date):
-        """Create a journal voucher"""
-        amount = round_amount(random.uniform(1000, 100000))
-        
+    def _batch_create_journals(self, numbers, days, amounts):
+        """Create a batch of journal vouchers"""
         # Various journal types
         journal_types = [
             ("Depreciation Entry", "Depreciation", "Plant & Machinery"),
@@ -872,148 +1314,162 @@ class TallyDataGenerator:
             ("Interest Provision", "Interest on Loan", "Statutory Liabilities"),
             ("TDS Entry", "TDS Receivable", "TDS Payable 194C"),
         ]
-        
-        j_type, debit_ledger, credit_ledger = random.choice(journal_types)
-        
-        # Use expense ledgers if available
-        if self.expense_ledgers and "Salary" in j_type:
-            debit_ledger = random.choice([e for e in self.expense_ledgers if "Salar" in e] or self.expense_ledgers[:1])[0] if isinstance(self.expense_ledgers[0], list) else random.choice([e for e in self.expense_ledgers if "Salar" in e] or [self.expense_ledgers[0]])
-        
-        return {
-            "voucher_number": f"JRN/{date.strftime('%y%m')}/{self.voucher_counter}",
-            "guid": f"voucher-{self.voucher_counter}",
-            "date": format_date(date),
-            "display_date": format_display_date(date),
-            "type": "Journal",
-            "voucher_type": "Journal",
-            "amount": amount,
-            "narration": f"{j_type} for {date.strftime('%B %Y')}",
-            "ledger_entries": [
-                {"ledger": debit_ledger, "amount": amount, "is_debit": True},
-                {"ledger": credit_ledger, "amount": amount, "is_debit": False}
-            ]
-        }
+        # Salary provisions are booked against a salary expense ledger when one exists
+        salary_ledgers = [e for e in self.expense_ledgers if "Salar" in e] or self.expense_ledgers[:1]
+        entries = pick_names(journal_types, len(numbers), self.rng, None)
+        salaries = pick_names(salary_ledgers, len(numbers), self.rng, None)
+        
+        vouchers = []
+        for number, day, (j_type, debit_ledger, credit_ledger), salary_ledger, (amount,) in zip(
+                numbers, days, entries, salaries, amounts):
+            if salary_ledger and "Salary" in j_type:
+                debit_ledger = salary_ledger
+            
+            vouchers.append({
+                "voucher_number": f"JRN/{VOUCHER_PERIODS[day]}/{number}",
+                "guid": f"voucher-{number}",
+                "date": TALLY_DATES[day],
+                "display_date": DISPLAY_DATES[day],
+                "type": "Journal",
+                "voucher_type": "Journal",
+                "amount": amount,
+                "narration": f"{j_type} for {NARRATION_MONTHS[day]}",
+                "ledger_entries": [
+                    {"ledger": debit_ledger, "amount": amount, "is_debit": True},
+                    {"ledger": credit_ledger, "amount": amount, "is_debit": False}
+                ]
+            })
+        return vouchers
     
-    def _create_contra_voucher(self, date):
-        """Create a contra voucher (cash to bank or vice versa)"""
-        amount = round_amount(random.uniform(10000, 500000))
-        
-        banks = ["HDFC Bank Current A/c", "ICICI Bank Current A/c", "State Bank of India", "Axis Bank Current A/c"]
-        
+    def _batch_create_contras(self, numbers, days, amounts):
+        """Create a batch of contra vouchers (cash to bank or vice versa)"""
         # Cash deposit or withdrawal
-        is_deposit = random.random() > 0.5
-        bank = random.choice(banks)
-        
-        if is_deposit:
-            debit_ledger = bank
-            credit_ledger = "Cash in Hand"
-            narration = f"Cash deposited to {bank}"
-        else:
-            debit_ledger = "Cash in Hand"
-            credit_ledger = bank
-            narration = f"Cash withdrawn from {bank}"
-        
-        return {
-            "voucher_number": f"CON/{date.strftime('%y%m')}/{self.voucher_counter}",
-            "guid": f"voucher-{self.voucher_counter}",
-            "date": format_date(date),
-            "display_date": format_display_date(date),
-            "type": "Contra",
-            "voucher_type": "Contra",
-            "amount": amount,
-            "is_deposit": is_deposit,
-            "narration": narration,
-            "ledger_entries": [
-                {"ledger": debit_ledger, "amount": amount, "is_debit": True},
-                {"ledger": credit_ledger, "amount": amount, "is_debit": False}
+        is_deposit = (self.rng.random(len(numbers)) > 0.5).tolist()
+        banks = pick_names(CONTRA_BANKS, len(numbers), self.rng, None)
+        
+        vouchers = []
+        for number, day, deposit, bank, (amount,) in zip(numbers, days, is_deposit, banks, amounts):
+            if deposit:
+                debit_ledger = bank
+                credit_ledger = "Cash in Hand"
+                narration = f"Cash deposited to {bank}"
+            else:
+                debit_ledger = "Cash in Hand"
+                credit_ledger = bank
+                narration = f"Cash withdrawn from {bank}"
+            
+            vouchers.append({
+                "voucher_number": f"CON/{VOUCHER_PERIODS[day]}/{number}",
+                "guid": f"voucher-{number}",
+                "date": TALLY_DATES[day],
+                "display_date": DISPLAY_DATES[day],
+                "type": "Contra",
+                "voucher_type": "Contra",
+                "amount": amount,
+                "is_deposit": deposit,
+                "narration": narration,
+                "ledger_entries": [
+                    {"ledger": debit_ledger, "amount": amount, "is_debit": True},
+                    {"ledger": credit_ledger, "amount": amount, "is_debit": False}
+                ]
+            })
+        return vouchers
+    
+    def _batch_create_credit_notes(self, numbers, days, amounts):
+        """Create a batch of credit notes (sales returns)"""
+        customers = pick_names(self.customer_ledgers, len(numbers), self.rng, "Cash")
+        # Each note refers back to any invoice numbered up to itself
+        original_numbers = self.rng.integers(1, np.arange(numbers.start, numbers.stop) + 1).tolist()
+        
+        vouchers = []
+        for number, day, customer, original, (base_amount, gst_rate, gst_amount, half_gst, total_amount, is_local) in zip(
+                numbers, days, customers, original_numbers, amounts):
+            ledger_entries = [
+                {"ledger": customer, "amount": total_amount, "is_debit": False},
+                {"ledger": "Sales Returns", "amount": base_amount, "is_debit": True},
             ]
-        }
+            
+            if gst_rate > 0:
+                if is_local:
+                    ledger_entries.append({"ledger": f"CGST Output {gst_rate}%", "amount": half_gst, "is_debit": True})
+                    ledger_entries.append({"ledger": f"SGST Output {gst_rate}%", "amount": half_gst, "is_debit": True})
+                else:
+                    ledger_entries.append({"ledger": f"IGST Output {gst_rate}%", "amount": gst_amount, "is_debit": True})
+            
+            vouchers.append({
+                "voucher_number": f"CRN/{VOUCHER_PERIODS[day]}/{number}",
+                "guid": f"voucher-{number}",
+                "date": TALLY_DATES[day],
+                "display_date": DISPLAY_DATES[day],
+                "type": "Credit Note",
+                "voucher_type": "Credit Note",
+                "party_name": customer,
+                "amount": total_amount,
+                "base_amount": base_amount,
+                "gst_rate": gst_rate,
+                "gst_amount": gst_amount,
+                "narration": f"Sales return from {customer}",
+                "ledger_entries": ledger_entries,
+                "original_invoice_no": f"SAL/{VOUCHER_PERIODS[day]}/{original}"
+            })
+        return vouchers
     
-    def _create_credit_note(self, date):
-        """Create a credit note (sales return)"""
-        customer = random.choice(self.customer_ledgers) if self.customer_ledgers else "Cash"
-        
-        base_amount = round_amount(random.uniform(500, 50000))
-        gst_rate = random.choice(GST_RATES)
-        gst_amount = round_amount(base_amount * gst_rate / 100)
-        total_amount = round_amount(base_amount + gst_amount)
-        
-        is_local = random.random() > 0.3
-        
-        ledger_entries = [
-            {"ledger": customer, "amount": total_amount, "is_debit": False},
-            {"ledger": "Sales Returns", "amount": base_amount, "is_debit": True},
-        ]
-        
-        if gst_rate > 0:
-            if is_local:
-                ledger_entries.append({"ledger": f"CGST Output {gst_rate}%", "amount": round_amount(gst_amount / 2), "is_debit": True})
-                ledger_entries.append({"ledger": f"SGST Output {gst_rate}%", "amount": round_amount(gst_amount / 2), "is_debit": True})
-            else:
-                ledger_entries.append({"ledger": f"IGST Output {gst_rate}%", "amount": gst_amount, "is_debit": True})
-        
-        return {
-            "voucher_number": f"CRN/{date.strftime('%y%m')}/{self.voucher_counter}",
-            "guid": f"voucher-{self.voucher_counter}",
-            "date": format_date(date),
-            "display_date": format_display_date(date),
-            "type": "Credit Note",
-            "voucher_type": "Credit Note",
-            "party_name": customer,
-            "amount": total_amount,
-            "base_amount": base_amount,
-            "gst_rate": gst_rate,
-            "gst_amount": gst_amount,
-            "narration": f"Sales return from {customer}",
-            "ledger_entries": ledger_entries,
-            "original_invoice_no": f"SAL/{date.strftime('%y%m')}/{random.randint(1, self.voucher_counter)}"
-        }
+    def _batch_create_debit_notes(self, numbers, days, amounts):
+        """Create a batch of debit notes (purchase returns)"""
+        suppliers = pick_names(self.supplier_ledgers, len(numbers), self.rng, "Cash")
+        # Each note refers back to any bill numbered up to itself
+        original_numbers = self.rng.integers(1, np.arange(numbers.start, numbers.stop) + 1).tolist()
+        
+        vouchers = []
+        for number, day, supplier, original, (base_amount, gst_rate, gst_amount, half_gst, total_amount, is_local) in zip(
+                numbers, days, suppliers, original_numbers, amounts):
+            ledger_entries = [
+                {"ledger": supplier, "amount": total_amount, "is_debit": True},
+                {"ledger": "Purchase Returns", "amount": base_amount, "is_debit": False},
+            ]
+            
+            if gst_rate > 0:
+                if is_local:
+                    ledger_entries.append({"ledger": f"CGST Input {gst_rate}%", "amount": half_gst, "is_debit": False})
+                    ledger_entries.append({"ledger": f"SGST Input {gst_rate}%", "amount": half_gst, "is_debit": False})
+                else:
+                    ledger_entries.append({"ledger": f"IGST Input {gst_rate}%", "amount": gst_amount, "is_debit": False})
+            
+            vouchers.append({
+                "voucher_number": f"DBN/{VOUCHER_PERIODS[day]}/{number}",
+                "guid": f"voucher-{number}",
+                "date": TALLY_DATES[day],
+                "display_date": DISPLAY_DATES[day],
+                "type": "Debit Note",
+                "voucher_type": "Debit Note",
+                "party_name": supplier,
+                "amount": total_amount,
+                "base_amount": base_amount,
+                "gst_rate": gst_rate,
+                "gst_amount": gst_amount,
+                "narration": f"Purchase return to {supplier}",
+                "ledger_entries": ledger_entries,
+                "original_invoice_no": f"PUR/{VOUCHER_PERIODS[day]}/{original}"
+            })
+        return vouchers
     
-    def _create_debit_note(self, date):
-        """Create a debit note (purchase return)"""
-        supplier = random.choice(self.supplier_ledgers) if self.supplier_ledgers else "Cash"
-        
-        base_amount = round_amount(random.uniform(500, 50000))
-        gst_rate = random.choice(GST_RATES)
-        gst_amount = round_amount(base_amount * gst_rate / 100)
-        total_amount = round_amount(base_amount + gst_amount)
-        
-        is_local = random.random() > 0.3
-        
-        ledger_entries = [
-            {"ledger": supplier, "amount": total_amount, "is_debit": True},
-            {"ledger": "Purchase Returns", "amount": base_amount, "is_debit": False},
-        ]
-        
-        if gst_rate > 0:
-            if is_local:
-                ledger_entries.append({"ledger": f"CGST Input {gst_rate}%", "amount": round_amount(gst_amount / 2), "is_debit": False})
-                ledger_entries.append({"ledger": f"SGST Input {gst_rate}%", "amount": round_amount(gst_amount / 2), "is_debit": False})
-            else:
-                ledger_entries.append({"ledger": f"IGST Input {gst_rate}%", "amount": gst_amount, "is_debit": False})
-        
-        return {
-            "voucher_number": f"DBN/{date.strftime('%y%m')}/{self.voucher_counter}",
-            "guid": f"voucher-{self.voucher_counter}",
-            "date": format_date(date),
-            "display_date": format_display_date(date),
-            "type": "Debit Note",
-            "voucher_type": "Debit Note",
-            "party_name": supplier,
-            "amount": total_amount,
-            "base_amount": base_amount,
-            "gst_rate": gst_rate,
-            "gst_amount": gst_amount,
-            "narration": f"Purchase return to {supplier}",
-            "ledger_entries": ledger_entries,
-            "original_invoice_no": f"PUR/{date.strftime('%y%m')}/{random.randint(1, self.voucher_counter)}"
-        }
+    # Batch builder for each voucher type, as used by the voucher workers
+    BATCH_CREATORS = {
+        "Sales": _batch_create_sales,
+        "Purchase": _batch_create_purchases,
+        "Receipt": _batch_create_receipts,
+        "Payment": _batch_create_payments,
+        "Journal": _batch_create_journals,
+        "Contra": _batch_create_contras,
+        "Credit Note": _batch_create_credit_notes,
+        "Debit Note": _batch_create_debit_notes,
+    }
     
     def _generate_summary(self):
         """Generate financial summary"""
-        # Calculate from vouchers
-        total_revenue = sum(v.get("amount", 0) for v in self.data["vouchers"] if v.get("type") == "Sales")
-        total_expense = sum(v.get("amount", 0) for v in self.data["vouchers"] if v.get("type") == "Purchase")
+        # Vouchers are already on disk: use the running totals
+        total_revenue = self.total_sales
+        total_expense = self.total_purchases
         
         # Convert monthly data to list format for charts
         monthly_sales_list = []
@@ -1023,25 +1479,18 @@ class TallyDataGenerator:
         for i, month in enumerate(months, 1):
             monthly_sales_list.append({
                 "month": month,
-                "value": round_amount(self.monthly_sales.get(i, 0))
+                "value": round_amount(float(self.monthly_sales[i]))
             })
             monthly_purchases_list.append({
                 "month": month,
-                "value": round_amount(self.monthly_purchases.get(i, 0))
+                "value": round_amount(float(self.monthly_purchases[i]))
             })
         
-        # Calculate assets and liabilities from ledgers
-        total_assets = sum(l.get("closing_balance", 0) for l in self.data["ledgers"] 
-                         if l.get("parent") in ["Bank Accounts", "Cash-in-Hand", "Fixed Assets", 
-                                                "Current Assets", "Investments", "Stock-in-Hand",
-                                                "Loans & Advances (Asset)"])
-        
-        total_liabilities = abs(sum(l.get("closing_balance", 0) for l in self.data["ledgers"]
-                                   if l.get("parent") in ["Current Liabilities", "Loans (Liability)", 
-                                                          "Bank OD A/c", "Duties & Taxes"]))
-        
-        total_equity = abs(sum(l.get("closing_balance", 0) for l in self.data["ledgers"]
-                              if l.get("parent") in ["Capital Account", "Reserves & Surplus"]))
+        # Calculate assets and liabilities from ledger group balances
+        balances = self.group_balances
+        total_assets = sum(balances.get(group, 0) for group in ASSET_GROUPS)
+        total_liabilities = abs(sum(balances.get(group, 0) for group in LIABILITY_GROUPS))
+        total_equity = abs(sum(balances.get(group, 0) for group in EQUITY_GROUPS))
         
         self.data["summary"] = {
             "company_name": self.company_name,
@@ -1062,35 +1511,41 @@ class TallyDataGenerator:
             "total_customers": len(self.customer_ledgers),
             "total_suppliers": len(self.supplier_ledgers),
             "total_stock_items": len(self.stock_item_names),
-            "total_ledgers": len(self.data["ledgers"]),
-            "total_vouchers": len(self.data["vouchers"]),
+            "total_ledgers": self.ledger_counter,
+            "total_vouchers": self.voucher_counter,
             "monthly_sales": monthly_sales_list,
             "monthly_purchases": monthly_purchases_list,
             "generated_at": datetime.now().isoformat()
         }
     
     def save_to_json(self, filename=None):
-        """Save data to JSON file"""
+        """Save the masters and summary to a JSON file next to the streamed NDJSON sections"""
         if filename is None:
-            filename = f"tally_backup_{self.company_name.replace(' ', '_')[:30]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            stem = self.file_stem or f"tally_backup_{self.company_name.replace(' ', '_')[:30]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            filename = f"{stem}.json"
         
         # Ensure output directory exists
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
-        filepath = os.path.join(OUTPUT_DIR, filename)
+        output_dir = self.output_dir or OUTPUT_DIR
+        os.makedirs(output_dir, exist_ok=True)
+        filepath = os.path.join(output_dir, filename)
         
         print(f"\n💾 Saving to {filepath}...")
         
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(self.data, f, indent=2, ensure_ascii=False)
         
-        # Get file size
-        file_size = os.path.getsize(filepath)
+        # Get file size, including the streamed sections
+        file_size = os.path.getsize(filepath) + sum(
+            os.path.getsize(os.path.join(output_dir, name)) for name in self.data["files"].values()
+        )
         size_mb = file_size / (1024 * 1024)
         size_gb = file_size / (1024 * 1024 * 1024)
         
         print(f"✅ Saved successfully!")
         print(f"   File size: {size_mb:.2f} MB ({size_gb:.2f} GB)")
         print(f"   Location: {filepath}")
+        for section, name in self.data["files"].items():
+            print(f"   {section}: {os.path.join(output_dir, name)}")
         
         return filepath
 